@@ -0,0 +1,50 @@
+"""
+Password hashers with the cost taken from settings, so it can be tuned per deployment.
+
+The hashers keep the algorithm names of Django's hashers, so existing hashes are still verified.
+Django upgrades a hash when the user logs in and the hash was made with another algorithm than
+the preferred one (the first in `PASSWORD_HASHERS`) or with other cost parameters than the
+current ones, so changing the policy never requires a migration of existing users.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2 with SHA256, with `PASSWORD_PBKDF2_ITERATIONS` iterations.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """
+    scrypt with `PASSWORD_SCRYPT_WORK_FACTOR` (N, a power of 2) as its CPU and memory cost.
+    """
+
+    # Upper limit of the memory scrypt may use (it needs about 1 KiB times N), the default limit
+    # of OpenSSL (32 MiB) rejects work factors above 2**14.
+    maxmem = 2**30
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Argon2id with `PASSWORD_ARGON2_TIME_COST` iterations over `PASSWORD_ARGON2_MEMORY_COST` KiB of
+    memory. Requires the argon2-cffi package.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
@@ -0,0 +1,95 @@
+import csv
+import json
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+
+def read_csv(file):
+    return list(csv.DictReader(file))
+
+
+def read_ndjson(file):
+    rows = []
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        # Broken lines become rows without an email, so they are reported with their number.
+        rows.append(row if isinstance(row, dict) else {})
+    return rows
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users from a CSV file (with email and password columns) or an NDJSON file "
+        "(with email and password keys)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File with the users")
+        parser.add_argument(
+            "--format",
+            choices=READERS,
+            help="Format of the file, by default taken from its extension",
+        )
+        parser.add_argument(
+            "--tokens",
+            action="store_true",
+            help="Create auth tokens for the imported users",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="Number of processes hashing passwords, by default one per CPU core",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of users inserted at once",
+        )
+
+    def handle(self, *args, **kwargs):
+        path = kwargs["path"]
+        file_format = kwargs["format"] or path.rsplit(".", 1)[-1].lower()
+        if file_format not in READERS:
+            raise CommandError(
+                f"Unknown format of {path}, use --format with one of: "
+                + ", ".join(READERS)
+            )
+
+        start = time.perf_counter()
+        try:
+            with open(path, newline="", encoding="utf-8") as file:
+                rows = READERS[file_format](file)
+        except OSError as error:
+            raise CommandError(f"Can not read {path}: {error}")
+
+        users, errors = get_user_model().objects.bulk_create_users(
+            rows, processes=kwargs["processes"], batch_size=kwargs["batch_size"]
+        )
+        if kwargs["tokens"]:
+            Token.objects.bulk_create(
+                [Token(user=user, key=Token.generate_key()) for user in users],
+                batch_size=kwargs["batch_size"],
+            )
+        elapsed = time.perf_counter() - start
+
+        for number, message in errors:
+            self.stderr.write(f"Row {number}: {message}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully imported {len(users)} users ({len(errors)} rows skipped)"
+                f" in {elapsed:.1f} s, {len(users) / elapsed:.0f} users/s."
+            )
+        )
@@ -1,4 +1,31 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import BaseUserManager
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+
+def setup_hashing_worker():
+    # Worker processes started with "spawn" (instead of "fork") do not inherit the set up Django.
+    if not apps.ready:
+        django.setup()
+
+
+def hash_passwords(passwords, processes=None):
+    """
+    Hashes the passwords (None makes an unusable password) in a pool of `processes` processes
+    (one per CPU core by default), because hashing is CPU-bound and slow on purpose.
+    """
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+
+    with ProcessPoolExecutor(processes, initializer=setup_hashing_worker) as executor:
+        chunk_size = max(1, len(passwords) // (processes * 4))
+        return list(executor.map(make_password, passwords, chunksize=chunk_size))
 
 
 class CustomUserManager(BaseUserManager):
@@ -31,3 +58,48 @@ class CustomUserManager(BaseUserManager):
             )
 
         return self.create_user(email, password, **extra_fields)
+
+    def bulk_create_users(self, rows, processes=None, batch_size=1000):
+        """
+        Creates users from dicts with "email" and "password" keys (users without a password get
+        an unusable one) with `bulk_create`, hashing the passwords in a pool of processes.
+
+        Rows with a missing or invalid email, or an email that already exists (in the database or
+        in an earlier row), are skipped. Returns the created users and the errors of the skipped
+        rows as (row number, message) pairs, rows are numbered from 1.
+        """
+        errors = []
+        valid_rows = {}
+        for number, row in enumerate(rows, start=1):
+            email = self.normalize_email(row.get("email") or "")
+            try:
+                validate_email(email)
+            except ValidationError as error:
+                errors.append((number, f"{error.messages[0]} ({email!r})"))
+                continue
+            if email in valid_rows:
+                errors.append((number, f"Email {email} is repeated."))
+                continue
+            valid_rows[email] = (number, row.get("password") or None)
+
+        emails = list(valid_rows)
+        existing = set()
+        for start in range(0, len(emails), batch_size):
+            existing.update(
+                self.filter(email__in=emails[start : start + batch_size]).values_list(
+                    "email", flat=True
+                )
+            )
+        for email in existing:
+            errors.append((valid_rows.pop(email)[0], f"Email {email} already exists."))
+
+        passwords = hash_passwords(
+            [password for number, password in valid_rows.values()], processes
+        )
+        users = [
+            self.model(email=email, password=password)
+            for email, password in zip(valid_rows, passwords)
+        ]
+        # All batches are inserted in one transaction.
+        users = self.bulk_create(users, batch_size=batch_size)
+        return users, sorted(errors)
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+User = get_user_model()
+
+HASHERS = [
+    "accounts.hashers.PBKDF2PasswordHasher",
+    "accounts.hashers.ScryptPasswordHasher",
+]
+
+
+@override_settings(
+    PASSWORD_HASHERS=HASHERS,
+    PASSWORD_PBKDF2_ITERATIONS=1000,
+    PASSWORD_SCRYPT_WORK_FACTOR=2**4,
+)
+class PasswordHashersTests(APITestCase):
+    """
+    Tests of the password hashers with the cost taken from settings, and of the upgrade of
+    existing hashes when their users log in.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test_user@email.com", password="test_pass"
+        )
+
+    def log_in(self):
+        response = self.client.post(
+            reverse("login_api_view"),
+            {"email": "test_user@email.com", "password": "test_pass"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+
+    def test_cost_is_taken_from_settings(self):
+        self.assertTrue(make_password("test_pass").startswith("pbkdf2_sha256$1000$"))
+
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertTrue(
+                make_password("test_pass").startswith("pbkdf2_sha256$2000$")
+            )
+
+    def test_hash_is_upgraded_to_new_cost_on_login(self):
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            # The old hash is still valid.
+            self.assertTrue(self.user.check_password("test_pass"))
+            self.log_in()
+
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+
+    def test_hash_is_upgraded_to_new_algorithm_on_login(self):
+        with self.settings(PASSWORD_HASHERS=list(reversed(HASHERS))):
+            self.log_in()
+
+        self.assertTrue(self.user.password.startswith("scrypt$16$"))
+        # I am checking that the password still works after the upgrade.
+        self.log_in()
+
+    def test_hash_with_current_policy_is_not_changed_on_login(self):
+        password = self.user.password
+        self.log_in()
+
+        self.assertEqual(self.user.password, password)
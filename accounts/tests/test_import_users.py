@@ -0,0 +1,99 @@
+import os
+import tempfile
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+User = get_user_model()
+
+
+class BulkCreateUsersTests(TestCase):
+    """
+    Tests of CustomUserManager.bulk_create_users and of the import_users command.
+    """
+
+    def write_file(self, suffix, content):
+        file = tempfile.NamedTemporaryFile("w", suffix=suffix, delete=False)
+        with file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def test_bulk_create_users(self):
+        User.objects.create_user(email="existing@email.com", password="test_pass")
+
+        users, errors = User.objects.bulk_create_users(
+            [
+                {"email": "first@email.com", "password": "first_pass"},
+                {"email": "second@EMAIL.com", "password": "second_pass"},
+                {"email": "not an email", "password": "test_pass"},
+                {"email": "first@email.com", "password": "test_pass"},
+                {"email": "existing@email.com", "password": "test_pass"},
+                {"email": "third@email.com"},
+            ],
+            processes=2,
+        )
+
+        self.assertEqual(
+            [user.email for user in users],
+            ["first@email.com", "second@email.com", "third@email.com"],
+        )
+        self.assertEqual([number for number, message in errors], [3, 4, 5])
+        self.assertIn("already exists", errors[2][1])
+        # Passwords were hashed in other processes.
+        self.assertTrue(
+            User.objects.get(email="first@email.com").check_password("first_pass")
+        )
+        self.assertTrue(
+            User.objects.get(email="second@email.com").check_password("second_pass")
+        )
+        self.assertFalse(
+            User.objects.get(email="third@email.com").has_usable_password()
+        )
+
+    def test_bulk_create_users_queries(self):
+        rows = [
+            {"email": f"user{num}@email.com", "password": "test_pass"}
+            for num in range(10)
+        ]
+
+        # I am checking that existing emails are looked up and users are inserted in batches.
+        with self.assertNumQueries(4):
+            User.objects.bulk_create_users(rows, processes=1, batch_size=5)
+
+        self.assertEqual(User.objects.count(), 10)
+
+    def test_import_csv_with_tokens(self):
+        path = self.write_file(
+            ".csv",
+            "email,password\nfirst@email.com,first_pass\n,test_pass\n"
+            "second@email.com,second_pass\n",
+        )
+        output = StringIO()
+        errors = StringIO()
+
+        call_command("import_users", path, "--tokens", stdout=output, stderr=errors)
+
+        self.assertIn("imported 2 users (1 rows skipped)", output.getvalue())
+        self.assertIn("Row 2: Enter a valid email address.", errors.getvalue())
+        self.assertEqual(Token.objects.count(), 2)
+        self.assertTrue(
+            User.objects.get(email="second@email.com").check_password("second_pass")
+        )
+
+    def test_import_ndjson(self):
+        path = self.write_file(
+            ".ndjson",
+            '{"email": "first@email.com", "password": "first_pass"}\n'
+            "not json\n"
+            '{"email": "second@email.com", "password": "second_pass"}\n',
+        )
+        errors = StringIO()
+
+        call_command("import_users", path, stdout=StringIO(), stderr=errors)
+
+        self.assertEqual(User.objects.count(), 2)
+        self.assertIn("Row 2:", errors.getvalue())
+        self.assertEqual(Token.objects.count(), 0)
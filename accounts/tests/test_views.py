@@ -1,9 +1,9 @@
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in
 from rest_framework.test import APITestCase
 from rest_framework import status
 
-
 User = get_user_model()
 
 
@@ -53,3 +53,34 @@ class SignUpAPITests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(User.objects.count(), 1)
+
+
+class LoginAPITests(APITestCase):
+    def setUp(self):
+        self.login_url = reverse("login_api_view")
+        self.user = User.objects.create_user(
+            email="test_user@email.com", password="test_pass"
+        )
+
+    def test_login_updates_last_login(self):
+        logged_in_users = []
+
+        def receiver(sender, user, **kwargs):
+            logged_in_users.append(user)
+
+        user_logged_in.connect(receiver)
+        self.addCleanup(user_logged_in.disconnect, receiver)
+
+        response = self.client.post(
+            self.login_url,
+            {"email": "test_user@email.com", "password": "test_pass"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("key", response.json())
+        self.assertEqual(logged_in_users, [self.user])
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        # I am checking that the API still does not use sessions.
+        self.assertNotIn("sessionid", response.cookies)
@@ -1,7 +1,6 @@
-from dj_rest_auth.views import LoginView, LogoutView, UserDetailsView
+from dj_rest_auth.views import LogoutView, UserDetailsView
 from django.urls import path
-from .views import SignUpAPIView
-
+from .views import LoginView, SignUpAPIView
 
 urlpatterns = [
     path("signup/", SignUpAPIView.as_view(), name="signup_api_view"),
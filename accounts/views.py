@@ -1,3 +1,5 @@
+from dj_rest_auth.views import LoginView as BaseLoginView
+from django.contrib.auth.signals import user_logged_in
 from rest_framework.generics import CreateAPIView
 from rest_framework.permissions import AllowAny
 from accounts.serializers import SignUpSerializer
@@ -25,3 +27,17 @@ class SignUpAPIView(CreateAPIView):
     permission_classes = [
         AllowAny,
     ]
+
+
+class LoginView(BaseLoginView):
+    """
+    Login endpoint of dj_rest_auth, which returns a token without logging the user in a session
+    (`SESSION_LOGIN` is disabled). `user_logged_in` is still sent, so `last_login` of the user is
+    updated as it is by a session login.
+    """
+
+    def login(self):
+        super().login()
+        user_logged_in.send(
+            sender=self.user.__class__, request=self.request, user=self.user
+        )
@@ -0,0 +1,297 @@
+"""
+Load test of the public API: seeds a dataset of the given size and drives the main endpoints with
+concurrent clients (Django test clients in threads, so no server is needed), then reports
+throughput, p50/p95/p99 latency and the number of database queries per request of every scenario.
+
+The project uses PostgreSQL specific fields (arrays with GIN indexes), so the benchmark runs
+against PostgreSQL (a local instance is enough), in a throwaway test database.
+
+Results can be saved as a baseline and later runs compared with it. A run fails (exit status 1)
+when a scenario executes more queries per request than in the baseline, or when its p95 latency
+or throughput gets worse by more than `--tolerance`:
+
+    python -m benchmarks.api --save-baseline benchmarks/baseline.json
+    python -m benchmarks.api --baseline benchmarks/baseline.json
+
+Usage: python -m benchmarks.api [--books 1000] [--users 50] [--concurrency 4] [--requests 200]
+"""
+
+import argparse
+import json
+import secrets
+import statistics
+import sys
+import threading
+import time
+from .utils import setup_django, test_database, seed_books
+
+# Scenario name: function returning (user, method, path, data) of the request number `index`
+# sent by the worker number `worker`. `user` is None for anonymous requests.
+SCENARIOS = {
+    "book-list": lambda dataset, worker, index: (None, "get", "/api/books/", None),
+    "book-list-sparse": lambda dataset, worker, index: (
+        None,
+        "get",
+        "/api/books/",
+        {"fields": "id,title,book_cover,available"},
+    ),
+    "book-filter": lambda dataset, worker, index: (
+        None,
+        "get",
+        "/api/books/",
+        {"genre__genre_name": f"Genre {index % 35}", "available": "true"},
+    ),
+    "book-retrieve": lambda dataset, worker, index: (
+        None,
+        "get",
+        f"/api/books/{dataset.books[index % len(dataset.books)]}/",
+        None,
+    ),
+    # Every worker requests books as a different user, so that requests are never duplicates.
+    "booking-create": lambda dataset, worker, index: (
+        dataset.requesters[worker],
+        "post",
+        "/api/bookings/",
+        {"book": str(dataset.books[index]), "additional_information": "Hello"},
+    ),
+    "booking-list": lambda dataset, worker, index: (
+        dataset.owner,
+        "get",
+        "/api/bookings/",
+        None,
+    ),
+    "booking-manage": lambda dataset, worker, index: (
+        dataset.owner,
+        "put",
+        f"/api/bookings/manage/{dataset.booking_requests[worker][index]}/",
+        {"approve": False},
+    ),
+    "notifications": lambda dataset, worker, index: (
+        dataset.requesters[worker],
+        "get",
+        "/api/bookings/notifications/",
+        None,
+    ),
+}
+
+
+class Dataset:
+    """
+    Books of one owner, users who request them (one per worker) with notifications, booking
+    requests which are rejected by the `booking-manage` scenario and tokens of all the users.
+    """
+
+    def __init__(self, books, users, concurrency, requests, notifications):
+        from django.contrib.auth import get_user_model
+        from rest_framework.authtoken.models import Token
+        from bookingrequests.models import BookingRequest, Notification
+
+        User = get_user_model()
+        books = seed_books(books)
+        self.books = [book.id for book in books]
+        self.owner = books[0].owner
+
+        # Hashing passwords is slow and the users never log in.
+        users = User.objects.bulk_create(
+            [
+                User(email=f"requester{num}@email.com", password="!")
+                for num in range(max(users, concurrency))
+            ]
+        )
+        self.requesters = users[:concurrency]
+        self.tokens = {
+            token.user_id: token.key
+            for token in Token.objects.bulk_create(
+                [
+                    Token(user=user, key=secrets.token_hex(20))
+                    for user in [self.owner, *users]
+                ]
+            )
+        }
+
+        # Booking requests rejected by the `booking-manage` scenario, a separate list for every
+        # worker. They are made for the last books, `booking-create` requests the first ones.
+        per_worker = requests // concurrency
+        self.booking_requests = []
+        for worker in range(concurrency):
+            self.booking_requests.append(
+                [
+                    booking_request.id
+                    for booking_request in BookingRequest.objects.bulk_create(
+                        [
+                            BookingRequest(
+                                book_id=self.books[-(index + 1)],
+                                requester=users[(worker + 1) % len(users)],
+                            )
+                            for index in range(
+                                worker * per_worker, (worker + 1) * per_worker
+                            )
+                        ]
+                    )
+                ]
+            )
+
+        Notification.objects.bulk_create(
+            [
+                Notification(
+                    user=user,
+                    book=f"Book {num}",
+                    approved=num % 2 == 0,
+                    retrieval_location="Tbilisi" if num % 2 == 0 else "",
+                )
+                for user in self.requesters
+                for num in range(notifications)
+            ]
+        )
+
+
+def run_scenario(name, dataset, concurrency, requests):
+    """
+    Sends `requests` requests of the scenario split between `concurrency` threads and returns
+    the latencies (in seconds), numbers of queries of the requests and the wall-clock time.
+    """
+    from django.db import connections
+    from rest_framework.test import APIClient
+    from book_giveaway.instrumentation import collect_metrics
+
+    build_request = SCENARIOS[name]
+    latencies = []
+    query_counts = []
+    errors = []
+
+    def worker(number):
+        client = APIClient()
+        try:
+            for index in range(requests // concurrency):
+                user, method, path, data = build_request(dataset, number, index)
+                extra = {}
+                if user is not None:
+                    extra["HTTP_AUTHORIZATION"] = f"Token {dataset.tokens[user.id]}"
+                if method != "get":
+                    extra["format"] = "json"
+
+                start = time.perf_counter()
+                with collect_metrics() as metrics:
+                    response = getattr(client, method)(path, data, **extra)
+                latencies.append(time.perf_counter() - start)
+                query_counts.append(metrics.query_count)
+
+                if response.status_code >= 400:
+                    errors.append(f"{method.upper()} {path}: {response.status_code}")
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=worker, args=(number,)) for number in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if errors:
+        raise RuntimeError(f"Scenario {name} failed: {errors[0]}")
+    return latencies, query_counts, elapsed
+
+
+def summarize(latencies, query_counts, elapsed):
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentiles[49] * 1000, 2),
+        "p95_ms": round(percentiles[94] * 1000, 2),
+        "p99_ms": round(percentiles[98] * 1000, 2),
+        "queries": round(statistics.mean(query_counts), 2),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns descriptions of the regressions of the results compared with the baseline.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["queries"] > expected["queries"]:
+            regressions.append(
+                f"{name}: {result['queries']} queries per request, "
+                f"baseline {expected['queries']}"
+            )
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']} ms, baseline {expected['p95_ms']} ms"
+            )
+        if result["throughput"] < expected["throughput"] / (1 + tolerance):
+            regressions.append(
+                f"{name}: {result['throughput']} requests/s, "
+                f"baseline {expected['throughput']} requests/s"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--notifications", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS
+    )
+    parser.add_argument("--baseline", help="JSON file to compare the results with.")
+    parser.add_argument("--save-baseline", help="JSON file to save the results to.")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.requests * 2 > args.books:
+        parser.error("--books must be at least twice as many as --requests.")
+
+    setup_django()
+    results = {}
+
+    with test_database():
+        dataset = Dataset(
+            args.books,
+            args.users,
+            args.concurrency,
+            args.requests,
+            args.notifications,
+        )
+
+        print(
+            f"{'scenario':<15} {'requests/s':>10} {'p50 ms':>9} {'p95 ms':>9}"
+            f" {'p99 ms':>9} {'queries':>8}"
+        )
+        for name in args.scenarios:
+            result = summarize(
+                *run_scenario(name, dataset, args.concurrency, args.requests)
+            )
+            results[name] = result
+            print(
+                f"{name:<15} {result['throughput']:>10} {result['p50_ms']:>9}"
+                f" {result['p95_ms']:>9} {result['p99_ms']:>9} {result['queries']:>8}"
+            )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
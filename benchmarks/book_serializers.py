@@ -0,0 +1,43 @@
+"""
+Compares rows per second of `BookSerializer` and `BookReadSerializer` for a list of books.
+
+Usage: python -m benchmarks.book_serializers [--books 5000] [--repeat 5]
+"""
+
+import argparse
+from .utils import setup_django, test_database, seed_books, best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.test import APIRequestFactory
+    from books.models import Book
+    from books.serializers import BookSerializer, BookReadSerializer
+
+    with test_database():
+        seed_books(args.books)
+        context = {"request": APIRequestFactory().get("/api/books/")}
+        queryset = Book.objects.select_related("owner").prefetch_related(
+            "genre", "author"
+        )
+
+        for serializer_class in (BookSerializer, BookReadSerializer):
+            seconds = best_time(
+                lambda: serializer_class(
+                    queryset.all(), many=True, context=context
+                ).data,
+                repeat=args.repeat,
+            )
+            print(
+                f"{serializer_class.__name__:<20} {args.books / seconds:>10.0f} rows/s"
+                f" ({seconds * 1000:.1f} ms for {args.books} books)"
+            )
+
+
+if __name__ == "__main__":
+    main()
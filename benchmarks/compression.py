@@ -0,0 +1,62 @@
+"""
+Compares the content codings of `CompressionMiddleware` on the JSON of the book list: size of the
+compressed response, bytes saved and CPU time spent compressing it, for every available coding at
+several levels. The response is compressed in memory, without the HTTP server.
+
+Usage: python -m benchmarks.compression [--books 1000] [--repeat 5]
+"""
+
+import argparse
+from .utils import setup_django, test_database, seed_books, best_time
+
+# Setting of the level of every coding: levels to compare (the default one is marked).
+LEVELS = {
+    "gzip": ("COMPRESSION_GZIP_LEVEL", (1, 6, 9)),
+    "br": ("COMPRESSION_BROTLI_QUALITY", (1, 4, 6, 11)),
+    "zstd": ("COMPRESSION_ZSTD_LEVEL", (1, 3, 9, 19)),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+    from book_giveaway.compression import CODECS
+
+    with test_database():
+        seed_books(args.books)
+        content = APIClient().get("/api/books/").content
+
+    print(f"book list of {args.books} books: {len(content)} bytes")
+    print(
+        f"{'coding':<12} {'bytes':>9} {'saved':>7} {'ms':>8} {'MB/s':>8}"
+        f" {'µs per KB saved':>16}"
+    )
+    for encoding, (setting, levels) in LEVELS.items():
+        if encoding not in CODECS:
+            print(f"{encoding:<12} not installed")
+            continue
+        for level in levels:
+            with override_settings(**{setting: level}):
+                compressed = CODECS[encoding].compress(content)
+                seconds = best_time(
+                    lambda: CODECS[encoding].compress(content), args.repeat
+                )
+            saved = len(content) - len(compressed)
+            default = "*" if getattr(settings, setting) == level else ""
+            print(
+                f"{f'{encoding}-{level}{default}':<12} {len(compressed):>9}"
+                f" {saved / len(content):>7.1%} {seconds * 1000:>8.2f}"
+                f" {len(content) / seconds / 1e6:>8.1f}"
+                f" {seconds * 1e6 / (saved / 1024):>16.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compares throughput and latency of the book list under many concurrent clients, with one worker
+process of the production server in every mode:
+
+* `wsgi` - WSGI with a pool of threads and synchronous views.
+* `asgi` - ASGI (uvicorn worker) with synchronous views.
+* `asgi-async` - ASGI (uvicorn worker) with async views (`ASYNC_VIEWS`).
+
+Usage: python -m benchmarks.concurrency [--books 200] [--clients 50] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from .utils import setup_django, test_database, seed_books
+
+MODES = {
+    "wsgi": {"SERVER_ASGI": "false", "ASYNC_VIEWS": "false"},
+    "asgi": {"SERVER_ASGI": "true", "ASYNC_VIEWS": "false"},
+    "asgi-async": {"SERVER_ASGI": "true", "ASYNC_VIEWS": "true"},
+}
+
+
+def start_server(mode, port, database_name, threads):
+    environment = dict(
+        os.environ,
+        NAME=database_name,
+        SERVER_BIND=f"127.0.0.1:{port}",
+        SERVER_WORKERS="1",
+        SERVER_THREADS=str(threads),
+        **MODES[mode],
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "book_giveaway.server"],
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"The server in {mode} mode did not start.")
+
+
+async def client(port, path, deadline, latencies):
+    """
+    Sends requests over one keep-alive connection until the deadline, recording their latencies.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        writer.write(request)
+        headers = await reader.readuntil(b"\r\n\r\n")
+        if not headers.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(headers.split(b"\r\n")[0].decode())
+        length = next(
+            int(line.split(b":")[1])
+            for line in headers.split(b"\r\n")
+            if line.lower().startswith(b"content-length:")
+        )
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+
+    writer.close()
+
+
+async def run_clients(port, path, clients, duration):
+    deadline = time.monotonic() + duration
+    latencies = []
+    await asyncio.gather(
+        *(client(port, path, deadline, latencies) for _ in range(clients))
+    )
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    with test_database():
+        seed_books(args.books)
+        database_name = connection.settings_dict["NAME"]
+
+        for mode in args.modes:
+            server = start_server(mode, args.port, database_name, args.threads)
+            try:
+                # Warming up the worker (imports, database connections) before measuring.
+                asyncio.run(run_clients(args.port, "/api/books/", args.clients, 1))
+                latencies = asyncio.run(
+                    run_clients(args.port, "/api/books/", args.clients, args.duration)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+
+            percentiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{mode:<11} {len(latencies) / args.duration:>8.0f} requests/s"
+                f"  p50 {percentiles[49] * 1000:>7.1f} ms"
+                f"  p99 {percentiles[98] * 1000:>7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compares DRF's `JSONRenderer` and `JSONParser` with `FastJSONRenderer` and `FastJSONParser` of
+the project (with orjson, when it is installed) on the representation of a list of books.
+
+Usage: python -m benchmarks.json_renderers [--books 5000] [--repeat 5]
+"""
+
+import argparse
+import io
+from .utils import setup_django, test_database, seed_books, best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from book_giveaway import fastjson
+    from book_giveaway.parsers import FastJSONParser
+    from book_giveaway.renderers import FastJSONRenderer
+    from books.models import Book
+    from books.serializers import BookReadSerializer
+
+    with test_database():
+        seed_books(args.books)
+        data = BookReadSerializer(Book.objects.all(), many=True).data
+
+    content = JSONRenderer().render(data)
+    print(
+        f"book list of {args.books} books: {len(content)} bytes,"
+        f" orjson {'installed' if fastjson.orjson else 'not installed'}"
+    )
+    for renderer, json_parser in (
+        (JSONRenderer(), JSONParser()),
+        (FastJSONRenderer(), FastJSONParser()),
+    ):
+        render_seconds = best_time(
+            lambda: renderer.render(data, "application/json"), args.repeat
+        )
+        parse_seconds = best_time(
+            lambda: json_parser.parse(io.BytesIO(content)), args.repeat
+        )
+        print(
+            f"{type(renderer).__name__:<18} render {render_seconds * 1000:>7.1f} ms"
+            f" {args.books / render_seconds:>9.0f} books/s | "
+            f"{type(json_parser).__name__:<15} parse {parse_seconds * 1000:>7.1f} ms"
+            f" {args.books / parse_seconds:>9.0f} books/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures how many passwords one CPU core can hash (sign-ups, password changes, upgrades of old
+hashes) and check (logins) per second with every password hashing algorithm and cost, to choose
+`PASSWORD_HASHER` and its cost settings for the hardware of the deployment.
+
+Argon2 is skipped when the argon2-cffi package is not installed.
+
+Usage: python -m benchmarks.logins [--hashers pbkdf2_sha256 scrypt] [--repeat 5]
+"""
+
+import argparse
+from .utils import setup_django, best_time
+
+# Algorithm: cost settings to compare, the first ones are Django's defaults.
+CONFIGS = {
+    "pbkdf2_sha256": [
+        {"PASSWORD_PBKDF2_ITERATIONS": iterations}
+        for iterations in (320000, 600000, 100000)
+    ],
+    "scrypt": [
+        {"PASSWORD_SCRYPT_WORK_FACTOR": work_factor}
+        for work_factor in (2**14, 2**15, 2**13)
+    ],
+    "argon2": [
+        {"PASSWORD_ARGON2_TIME_COST": 2, "PASSWORD_ARGON2_MEMORY_COST": 102400},
+        {"PASSWORD_ARGON2_TIME_COST": 3, "PASSWORD_ARGON2_MEMORY_COST": 65536},
+        {"PASSWORD_ARGON2_TIME_COST": 1, "PASSWORD_ARGON2_MEMORY_COST": 47104},
+    ],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hashers", nargs="+", default=list(CONFIGS), choices=CONFIGS)
+    parser.add_argument("--passwords", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.hashers import check_password, make_password
+    from django.test.utils import override_settings
+
+    for algorithm in args.hashers:
+        for config in CONFIGS[algorithm]:
+            with override_settings(
+                PASSWORD_HASHERS=[settings.TUNABLE_PASSWORD_HASHERS[algorithm]],
+                **config,
+            ):
+                try:
+                    encoded = make_password("benchmark_pass")
+                except ValueError:
+                    # Django could not load the library of the algorithm.
+                    print(f"{algorithm:<14} skipped, its library is not installed")
+                    break
+
+                make_time = best_time(
+                    lambda: [
+                        make_password("benchmark_pass") for _ in range(args.passwords)
+                    ],
+                    args.repeat,
+                )
+                check_time = best_time(
+                    lambda: [
+                        check_password("benchmark_pass", encoded)
+                        for _ in range(args.passwords)
+                    ],
+                    args.repeat,
+                )
+
+            cost = ", ".join(f"{name}={value}" for name, value in config.items())
+            print(
+                f"{algorithm:<14} {cost:<62}"
+                f" {args.passwords / make_time:>7.1f} hashes/s"
+                f" {args.passwords / check_time:>7.1f} logins/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
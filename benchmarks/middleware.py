@@ -0,0 +1,101 @@
+"""
+Measures the per-request overhead of the middleware stack for a token authenticated API request,
+with the stack of the settings (session, CSRF, authentication and messages middleware skipped for
+the API) and with Django's original session, CSRF, authentication and messages middleware.
+
+Requests go through the whole Django request handler to a DRF view which does no work, so the
+differences between the stacks are the differences of their middleware.
+
+Usage: python -m benchmarks.middleware [--requests 20000] [--repeat 5]
+"""
+
+import argparse
+from .utils import setup_django, best_time
+
+DJANGO_MIDDLEWARE = {
+    "book_giveaway.middleware.TokenAPISessionMiddleware": (
+        "django.contrib.sessions.middleware.SessionMiddleware"
+    ),
+    "book_giveaway.middleware.TokenAPICsrfViewMiddleware": (
+        "django.middleware.csrf.CsrfViewMiddleware"
+    ),
+    "book_giveaway.middleware.TokenAPIAuthenticationMiddleware": (
+        "django.contrib.auth.middleware.AuthenticationMiddleware"
+    ),
+    "book_giveaway.middleware.TokenAPIMessageMiddleware": (
+        "django.contrib.messages.middleware.MessageMiddleware"
+    ),
+}
+
+
+def ping(request):
+    from rest_framework.response import Response
+
+    return Response({"detail": "pong"})
+
+
+def urlconf():
+    from types import ModuleType
+    from django.urls import path
+    from rest_framework.decorators import (
+        api_view,
+        authentication_classes,
+        permission_classes,
+    )
+    from rest_framework.permissions import AllowAny
+
+    view = api_view(["GET"])(
+        authentication_classes([])(permission_classes([AllowAny])(ping))
+    )
+    module = ModuleType("benchmark_urls")
+    module.urlpatterns = [path("api/ping/", view)]
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+    from django.test.utils import override_settings
+
+    stacks = {
+        "token-api": settings.MIDDLEWARE,
+        "django": [DJANGO_MIDDLEWARE.get(path, path) for path in settings.MIDDLEWARE],
+    }
+    environ = RequestFactory().get("/api/ping/").environ
+
+    def start_response(status, headers):
+        assert status.startswith("200"), status
+
+    timings = {}
+    for name, middleware in stacks.items():
+        with override_settings(
+            MIDDLEWARE=middleware,
+            ROOT_URLCONF=urlconf(),
+            ALLOWED_HOSTS=["testserver"],
+        ):
+            handler = WSGIHandler()
+            timings[name] = best_time(
+                lambda: [
+                    handler(dict(environ), start_response) for _ in range(args.requests)
+                ],
+                args.repeat,
+            )
+
+    for name, seconds in timings.items():
+        print(
+            f"{name:<10} {seconds / args.requests * 1e6:>7.1f} µs/request"
+            f" {args.requests / seconds:>9.0f} requests/s"
+        )
+    saving = (timings["django"] - timings["token-api"]) / args.requests
+    print(f"saving     {saving * 1e6:>7.1f} µs/request")
+
+
+if __name__ == "__main__":
+    main()
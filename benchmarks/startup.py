@@ -0,0 +1,49 @@
+"""
+Measures how long importing the settings and `django.setup()` take for every settings profile.
+
+Every measurement runs in a fresh interpreter, so nothing is cached between them.
+
+Usage: python -m benchmarks.startup [--profiles dev prod] [--repeat 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+SETUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import django
+django.setup()
+print(time.perf_counter() - start)
+"""
+
+
+def setup_time(profile):
+    environment = dict(
+        os.environ, DJANGO_SETTINGS_MODULE=f"book_giveaway.settings.{profile}"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", SETUP_SCRIPT],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", nargs="+", default=["dev", "test", "prod"])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for profile in args.profiles:
+        seconds = min(setup_time(profile) for _ in range(args.repeat))
+        print(f"{profile:<6} {seconds * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
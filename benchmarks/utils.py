@@ -0,0 +1,85 @@
+"""
+Helpers shared by the benchmarks.
+
+Benchmarks are run as modules from the root of the project (for example:
+`python -m benchmarks.book_serializers`) with the same environment variables as the project itself.
+They never touch the configured database, a throwaway test database is created for every run.
+"""
+
+import os
+import random
+import time
+from contextlib import contextmanager
+import django
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "book_giveaway.settings.prod")
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """
+    Creates test databases (just like `manage.py test` does) and destroys them on exit.
+    """
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def seed_books(count, authors=25, genres=35):
+    """
+    Creates an owner, authors, genres and `count` books with two authors and two genres each.
+    """
+    from django.contrib.auth import get_user_model
+    from books.models import Book, Genre, Author
+    from books.tests.factories import bulk_create_books
+
+    owner = get_user_model().objects.create_user(
+        email="benchmark@email.com", password="benchmark_pass"
+    )
+    authors = Author.objects.bulk_create(
+        [Author(author_name=f"Author {num}") for num in range(authors)]
+    )
+    genres = Genre.objects.bulk_create(
+        [Genre(genre_name=f"Genre {num}") for num in range(genres)]
+    )
+    random_generator = random.Random(count)
+    return bulk_create_books(
+        [
+            Book(
+                title=f"Book {num}",
+                ISBN=str(num),
+                description="Description of the book. " * 10,
+                retrieval_location=f"Tbilisi, street {num}",
+                owner=owner,
+            )
+            for num in range(count)
+        ],
+        [random_generator.sample(authors, 2) for _ in range(count)],
+        [random_generator.sample(genres, 2) for _ in range(count)],
+    )
+
+
+def best_time(function, repeat=5):
+    """
+    Calls the function `repeat` times and returns the best wall-clock time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,112 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.core.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSetMixin
+
+
+async def async_list(queryset):
+    """
+    Evaluates the queryset without blocking the event loop.
+
+    Uses the async ORM interface when Django provides it (4.1+), otherwise the query is executed
+    with `sync_to_async`, just like the async ORM interface of Django does it.
+    """
+    if hasattr(queryset, "aiterator"):
+        return [obj async for obj in queryset]
+    return await sync_to_async(list)(queryset)
+
+
+async def async_get(queryset, **lookups):
+    """
+    Async version of `queryset.get(**lookups)`.
+    """
+    if hasattr(queryset, "aget"):
+        return await queryset.aget(**lookups)
+    return await sync_to_async(queryset.get)(**lookups)
+
+
+class AsyncReadMixin:
+    """
+    Mixin for DRF views which adds async implementations of the `list` and `retrieve` actions.
+
+    `as_async_view()` returns an async Django view, which serves GET and HEAD requests with the
+    `alist` and `aretrieve` methods, so under ASGI the request does not occupy a thread while
+    its queries are waiting for the database. Requests with other methods are handed to the
+    synchronous view, so they behave exactly as before.
+
+    Authentication, permissions and throttling are run by the synchronous `initial()` method (in
+    a thread, because authentication reads the database).
+    """
+
+    @classmethod
+    def as_async_view(cls, actions, **initkwargs):
+        if issubclass(cls, ViewSetMixin):
+            sync_view = cls.as_view(actions, **initkwargs)
+        else:
+            sync_view = cls.as_view(**initkwargs)
+
+        async def view(request, *args, **kwargs):
+            method = "get" if request.method == "HEAD" else request.method.lower()
+            action = actions.get(method)
+            if action not in ("list", "retrieve"):
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            self.action = action
+            return await self.async_dispatch(action, request, *args, **kwargs)
+
+        # Same attributes as views returned by `as_view()`, so the schema is generated as before.
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        view.csrf_exempt = True
+        return view
+
+    async def async_dispatch(self, action, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await getattr(self, f"a{action}")(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def alist(self, request, *args, **kwargs):
+        if self.paginator is not None:
+            return await sync_to_async(self.list)(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(await self.aserialize_list(queryset))
+
+    async def aserialize_list(self, queryset):
+        objects = await async_list(queryset)
+        return self.get_serializer(objects, many=True).data
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+    async def aget_object(self):
+        """
+        Async version of `GenericAPIView.get_object()`.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookups = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+        try:
+            obj = await async_get(queryset, **lookups)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+
+        self.check_object_permissions(self.request, obj)
+        return obj
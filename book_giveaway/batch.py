@@ -0,0 +1,236 @@
+"""
+Batch requests: several API requests sent in one HTTP request.
+
+The sub-requests are dispatched to their views through the URLconf, without the middleware,
+as the user authenticated by the batch request, so credentials are checked only once. Only
+requests to the token authenticated API (`TOKEN_API_PATH_PREFIXES`), which does not rely on the
+middleware, can be batched. Runs of
+consecutive sub-requests with safe methods can be run concurrently in threads, requests with
+other methods always run alone, in their order.
+"""
+
+import base64
+import contextvars
+import io
+from asyncio import iscoroutinefunction
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.handlers.exception import response_for_exception
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.http import JsonResponse
+from django.urls import Resolver404, get_resolver
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from . import fastjson
+
+# Headers of the batch request which are not passed to the sub-requests: the body of a
+# sub-request is its own and its responses are always JSON, not conditional or compressed.
+BATCH_ONLY_HEADERS = {
+    "CONTENT_LENGTH",
+    "CONTENT_TYPE",
+    "HTTP_ACCEPT",
+    "HTTP_ACCEPT_ENCODING",
+    "HTTP_IF_MATCH",
+    "HTTP_IF_MODIFIED_SINCE",
+    "HTTP_IF_NONE_MATCH",
+    "HTTP_IF_UNMODIFIED_SINCE",
+}
+
+
+# Content types of responses whose bodies are returned as text, others are encoded with base64.
+TEXT_CONTENT_TYPES = (
+    "application/javascript",
+    "application/vnd.oai.openapi",
+    "application/x-ndjson",
+    "application/xml",
+    "text/",
+)
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(
+        choices=["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"], default="GET"
+    )
+    path = serializers.RegexField(
+        r"^/", help_text="Path of the request, with the query string."
+    )
+    body = serializers.JSONField(required=False, help_text="JSON body of the request.")
+
+    def validate_path(self, value):
+        path = urlsplit(value).path
+        if path == self.context["batch_path"]:
+            raise serializers.ValidationError("Batch requests can not be nested.")
+        if not path.startswith(tuple(settings.TOKEN_API_PATH_PREFIXES)):
+            raise serializers.ValidationError(
+                "Only requests to the API can be batched."
+            )
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+    concurrent = serializers.BooleanField(
+        default=False,
+        help_text="Run consecutive requests with safe methods concurrently.",
+    )
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f"At most {settings.BATCH_MAX_REQUESTS} requests can be batched."
+            )
+        return value
+
+
+class SubResponseSerializer(serializers.Serializer):
+    status = serializers.IntegerField()
+    headers = serializers.DictField(child=serializers.CharField())
+    body = serializers.JSONField(allow_null=True)
+    body_encoding = serializers.ChoiceField(
+        choices=["base64"],
+        required=False,
+        help_text="Set when the body is binary and encoded with base64.",
+    )
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    responses = SubResponseSerializer(many=True)
+
+
+def make_request(request, method, path, body=None):
+    """
+    Returns the sub-request of the batch request with the method, path and JSON body, with the
+    user of the batch request.
+    """
+    url = urlsplit(path)
+    content = b"" if body is None else fastjson.dumps(body)
+    environ = {
+        key: value
+        for key, value in request.META.items()
+        if key not in BATCH_ONLY_HEADERS
+    }
+    environ.update(
+        {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+            "HTTP_ACCEPT": "application/json",
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(content)),
+            "wsgi.input": io.BytesIO(content),
+        }
+    )
+    sub_request = WSGIRequest(environ)
+    sub_request.user = request.user
+    if request.user.is_authenticated:
+        # DRF views use the user authenticated by the batch request instead of authenticating
+        # again. Anonymous requests still go through the authenticators, so the views answer them
+        # with their "401 Unauthorized" responses.
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def dispatch(request, method, path, body=None):
+    """
+    Runs the view of the sub-request and returns data of its response.
+    """
+    sub_request = make_request(request, method, path, body)
+    resolver = get_resolver(getattr(request, "urlconf", None))
+    try:
+        match = resolver.resolve(sub_request.path_info)
+    except Resolver404:
+        return response_data(JsonResponse({"detail": "Not found."}, status=404))
+
+    view = match.func
+    if iscoroutinefunction(view):
+        view = async_to_sync(view)
+    sub_request.resolver_match = match
+    try:
+        response = view(sub_request, *match.args, **match.kwargs)
+        if hasattr(response, "render"):
+            response.render()
+    except Exception as exc:
+        # The same response as the request handler would return for the exception.
+        response = response_for_exception(sub_request, exc)
+    return response_data(response)
+
+
+def response_data(response):
+    if response.streaming:
+        content = b"".join(response.streaming_content)
+    else:
+        content = response.content
+    content_type = response.get("Content-Type", "")
+    data = {"status": response.status_code, "headers": dict(response.items())}
+
+    if not content:
+        data["body"] = None
+    elif content_type.startswith("application/json"):
+        data["body"] = fastjson.loads(content)
+    elif content_type.startswith(TEXT_CONTENT_TYPES) and (
+        text := decode_text(content, response.charset)
+    ):
+        data["body"] = text
+    else:
+        data["body"] = base64.b64encode(content).decode()
+        data["body_encoding"] = "base64"
+    return data
+
+
+def decode_text(content, charset):
+    """
+    Returns the decoded content, or None when it is not valid text in the charset.
+    """
+    try:
+        return content.decode(charset)
+    except (UnicodeDecodeError, LookupError):
+        return None
+
+
+def dispatch_in_thread(request, method, path, body=None):
+    try:
+        return dispatch(request, method, path, body)
+    finally:
+        # The connections of the thread are not used again.
+        connections.close_all()
+
+
+def run_batch(request, sub_requests, concurrent=False):
+    """
+    Runs the sub-requests (dicts with "method", "path" and optional "body") and returns data of
+    their responses, in the same order.
+    """
+    responses = []
+    group = []
+
+    def run_group():
+        if len(group) < 2:
+            responses.extend(dispatch(request, **sub_request) for sub_request in group)
+        else:
+            with ThreadPoolExecutor(settings.BATCH_MAX_WORKERS) as executor:
+                # Every thread gets a copy of the context, to read from the same database.
+                futures = [
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        dispatch_in_thread,
+                        request,
+                        **sub_request,
+                    )
+                    for sub_request in group
+                ]
+                responses.extend(future.result() for future in futures)
+        group.clear()
+
+    for sub_request in sub_requests:
+        if concurrent and sub_request["method"] in SAFE_METHODS:
+            group.append(sub_request)
+            continue
+        run_group()
+        responses.append(dispatch(request, **sub_request))
+    run_group()
+
+    return responses
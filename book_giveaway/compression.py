@@ -0,0 +1,108 @@
+"""
+Content codings of compressed responses, used by `CompressionMiddleware`.
+
+gzip is always available, brotli ("br") needs the brotli package and zstd the zstandard
+package, codings whose package is not installed are never chosen.
+"""
+
+import gzip
+import zlib
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Gzip:
+    def compress(self, data):
+        return gzip.compress(data, settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+    def compress_stream(self, chunks):
+        # wbits=31 writes the gzip header and trailer.
+        compressor = zlib.compressobj(
+            settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31
+        )
+        for chunk in chunks:
+            # Every chunk is flushed, so the client gets it without waiting for the next one.
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+class Brotli:
+    def compress(self, data):
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress_stream(self, chunks):
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+
+class Zstd:
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(
+            data
+        )
+
+    def compress_stream(self, chunks):
+        compressor = zstandard.ZstdCompressor(
+            level=settings.COMPRESSION_ZSTD_LEVEL
+        ).compressobj()
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+        yield compressor.flush()
+
+
+# Content coding: compressor, for the codings available in this environment.
+CODECS = {"gzip": Gzip()}
+if brotli is not None:
+    CODECS["br"] = Brotli()
+if zstandard is not None:
+    CODECS["zstd"] = Zstd()
+
+
+def parse_accept_encoding(header):
+    """
+    Returns a dictionary of the codings of the Accept-Encoding header and their q-values.
+    """
+    codings = {}
+    for item in header.split(","):
+        coding, _, parameters = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def choose_encoding(header, encodings=None):
+    """
+    Returns the available coding the client prefers, of the `encodings` (`COMPRESSION_ENCODINGS`
+    by default), or None. Codings the client prefers equally are chosen in the order of `encodings`.
+    """
+    accepted = parse_accept_encoding(header)
+    default_quality = accepted.get("*", 0.0)
+    best_encoding, best_quality = None, 0.0
+    for encoding in settings.COMPRESSION_ENCODINGS if encodings is None else encodings:
+        quality = accepted.get(encoding, default_quality)
+        if encoding in CODECS and quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
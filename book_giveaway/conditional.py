@@ -0,0 +1,143 @@
+import hashlib
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The resource has been modified since it was read."
+    default_code = "precondition_failed"
+
+
+def make_etag(*parts):
+    digest = hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+class ConditionalRequestMixin:
+    """
+    Mixin for model views which adds conditional requests to the `list`, `retrieve`, `update` and
+    `destroy` actions, with validators derived from the `version_field` of the objects, a date
+    time which changes with every change of an object.
+
+    Objects get an ETag and Last-Modified from their version, lists only an ETag from the number
+    of their objects and the latest version, which one aggregate query reads. Lists have no
+    Last-Modified: deleting an object, or moving one out of the filter, does not make the latest
+    version newer. Reads of representations the
+    client already has (`If-None-Match`, `If-Modified-Since`) are answered with "304 Not Modified"
+    before anything is serialized, writes of objects which changed since the client read them
+    (`If-Match`, `If-Unmodified-Since`) fail with "412 Precondition Failed".
+
+    The view has to be a `GenericAPIView` of a model with the `version_field`: `list()` and
+    `perform_update()` extend the ones of `ListModelMixin` and `UpdateModelMixin`, and
+    `get_object()` checks the preconditions of every write, `destroy()` included. `alist()` and
+    `aretrieve()` also need `AsyncReadMixin` as a later base class, for its `alist()` and
+    `aget_object()`.
+    """
+
+    version_field = "updated"
+
+    # ETag and last modified time of the response, set by the actions.
+    validators = None
+
+    def get_object_validators(self, obj):
+        version = getattr(obj, self.version_field)
+        return make_etag(obj.pk, version.isoformat()), version
+
+    def get_list_validators(self, queryset):
+        summary = queryset.aggregate(
+            count=Count("pk"), last_modified=Max(self.version_field)
+        )
+        last_modified = summary["last_modified"]
+        etag = make_etag(
+            summary["count"], last_modified.isoformat() if last_modified else ""
+        )
+        return etag, None
+
+    def evaluate_preconditions(self, request, validators):
+        """
+        Returns a "304 Not Modified" response when the client has the current representation,
+        raises `PreconditionFailed` when a precondition of the request fails.
+        """
+        self.validators = validators
+        etag, last_modified = validators
+        if_match = request.META.get("HTTP_IF_MATCH")
+        if etag and if_match:
+            # Compressed responses have the weak form of the ETag (see `CompressionMiddleware`),
+            # which stands for the same version of the object.
+            request.META["HTTP_IF_MATCH"] = if_match.replace(f"W/{etag}", etag)
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+        if response is None:
+            return None
+        if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+            raise PreconditionFailed
+        return Response(status=status.HTTP_304_NOT_MODIFIED)
+
+    def get_object(self):
+        obj = super().get_object()
+        if self.request.method not in SAFE_METHODS:
+            self.evaluate_preconditions(self.request, self.get_object_validators(obj))
+        return obj
+
+    def list(self, request, *args, **kwargs):
+        if self.validators is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            response = self.evaluate_preconditions(
+                request, self.get_list_validators(queryset)
+            )
+            if response is not None:
+                return response
+        return super().list(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = await sync_to_async(self.get_list_validators)(queryset)
+        response = self.evaluate_preconditions(request, validators)
+        if response is not None:
+            return response
+        return await super().alist(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        response = self.evaluate_preconditions(
+            request, self.get_object_validators(instance)
+        )
+        if response is not None:
+            return response
+        return Response(self.get_serializer(instance).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        response = self.evaluate_preconditions(
+            request, self.get_object_validators(instance)
+        )
+        if response is not None:
+            return response
+        return Response(self.get_serializer(instance).data)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        # The response has the new version of the object.
+        self.validators = self.get_object_validators(serializer.instance)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.validators is not None and response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            etag, last_modified = self.validators
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
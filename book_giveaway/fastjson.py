@@ -0,0 +1,44 @@
+"""
+JSON encoding and decoding with orjson when it is installed and selected with `JSON_BACKEND`,
+otherwise with the json module of the standard library, as DRF does.
+
+orjson encodes UUIDs, datetimes, dates and times itself, other types DRF knows (decimals, lazy
+translations, querysets...) are converted by DRF's `JSONEncoder.default()`. The output is compact
+and not ASCII-escaped, like the one of DRF with its default settings.
+"""
+
+import json
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def use_orjson():
+    return orjson is not None and settings.JSON_BACKEND == "orjson"
+
+
+def dumps(data):
+    """
+    Returns the data encoded as JSON bytes.
+    """
+    if use_orjson():
+        return orjson.dumps(data, default=encoder.default, option=OPTIONS)
+    return encoder.encode(data).encode()
+
+
+def loads(content):
+    """
+    Returns the data decoded from JSON bytes or string, raises ValueError for invalid JSON.
+    """
+    if use_orjson():
+        return orjson.loads(content)
+    return json.loads(content)
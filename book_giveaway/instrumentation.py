@@ -0,0 +1,132 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+# Execute wrappers of `wrap_queries()` blocks, the innermost last.
+_query_wrappers = ContextVar("query_wrappers", default=())
+
+
+def execute_with_query_wrappers(execute, sql, params, many, context):
+    for wrapper in reversed(_query_wrappers.get()):
+        execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_wrappers(connection, **kwargs):
+    if execute_with_query_wrappers not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_with_query_wrappers)
+
+
+connection_created.connect(install_query_wrappers)
+
+
+@contextmanager
+def wrap_queries(wrapper):
+    """
+    Runs the queries executed within the block through the database execute wrapper, also when
+    they are executed in other threads, for example by `sync_to_async` under ASGI.
+
+    `connection.execute_wrapper()` only wraps the connections of the current thread, so instead
+    every connection runs its queries through the wrappers of the context that executes them.
+    """
+    for connection in connections.all():
+        install_query_wrappers(connection)
+    token = _query_wrappers.set(_query_wrappers.get() + (wrapper,))
+    try:
+        yield
+    finally:
+        _query_wrappers.reset(token)
+
+
+class RequestMetrics:
+    """
+    Metrics of a single request: number of database queries, time spent in the database and
+    time spent in named parts of the request (for example: "view" or "serializer").
+
+    Instances are used as database execute wrappers, so every executed query is counted.
+    """
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.timings = {}
+        self.view_start = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.db_time += time.perf_counter() - start
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+
+def current_metrics():
+    """
+    Returns metrics of the request being processed or None when metrics are not collected.
+    """
+    return _current_metrics.get()
+
+
+@contextmanager
+def collect_metrics():
+    """
+    Collects metrics of everything executed within the block. If metrics are already being
+    collected (for example by another middleware), the same metrics are reused.
+    """
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        yield metrics
+        return
+
+    metrics = RequestMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        with wrap_queries(metrics):
+            yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def timer(name):
+    """
+    Adds time spent within the block to the metrics of the current request, does nothing when
+    metrics are not collected.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, time.perf_counter() - start)
+
+
+class TimedSerializerMixin:
+    """
+    Records time spent on building `serializer.data` as "serializer" time of the current request.
+    Serializers that are used with `many=True` should also set `TimedListSerializer` as
+    `list_serializer_class` in their Meta class.
+    """
+
+    @property
+    def data(self):
+        with timer("serializer"):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
@@ -0,0 +1,251 @@
+"""
+In-process metrics registry with counters and histograms, rendered in Prometheus text format.
+
+Every process keeps its own values. When `METRICS_MULTIPROCESS_DIR` is set (for example when the
+project is served by several worker processes), every process writes its values to a JSON file in
+that directory at most once per second, and when it exits (see `book_giveaway.server`), and
+`/metrics` sums the values of all the files, so the endpoint returns the same totals no matter
+which worker handles the scrape.
+"""
+
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from django.conf import settings
+
+
+class Metric:
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = registry.lock
+        registry.register(self)
+
+    def label_values(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def format_labels(self, label_values, extra=()):
+        pairs = list(zip(self.labelnames, label_values)) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (
+            (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for name, value in pairs
+        )
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    def render(self, values):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for label_values in sorted(values):
+            lines.extend(self.render_sample(label_values, values[label_values]))
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.label_values(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def merge(self, values, other):
+        for key, value in other.items():
+            values[key] = values.get(key, 0) + value
+
+    def render_sample(self, label_values, value):
+        yield f"{self.name}{self.format_labels(label_values)} {value}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=()):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = sorted(buckets)
+
+    def observe(self, value, **labels):
+        key = self.label_values(labels)
+        with self.lock:
+            # Counts of observations for every bucket (not cumulative), the last one is +Inf.
+            # Followed by the sum and the count of all observations.
+            sample = self.values.get(key)
+            if sample is None:
+                sample = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            sample[bisect.bisect_left(self.buckets, value)] += 1
+            sample[-2] += value
+            sample[-1] += 1
+
+    def merge(self, values, other):
+        for key, sample in other.items():
+            if key not in values:
+                values[key] = list(sample)
+            else:
+                values[key] = [a + b for a, b in zip(values[key], sample)]
+
+    def render_sample(self, label_values, sample):
+        cumulative = 0
+        bounds = [str(bucket) for bucket in self.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, sample):
+            cumulative += count
+            labels = self.format_labels(label_values, [("le", bound)])
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = self.format_labels(label_values)
+        yield f"{self.name}_sum{labels} {sample[-2]}"
+        yield f"{self.name}_count{labels} {sample[-1]}"
+
+
+class Registry:
+    def __init__(self, flush_interval=1.0):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.flush_interval = flush_interval
+        self.flush_lock = threading.Lock()
+        self.flush_timer = None
+        self.last_flush = 0.0
+        self.pid = None
+
+    @property
+    def file_name(self):
+        # Worker processes forked from a process that already imported the registry (for example
+        # with preloading) must not share its file. Process ids can be reused, hence the uuid.
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self._file_name = f"metrics-{self.pid}-{uuid.uuid4().hex}.json"
+        return self._file_name
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return Counter(self, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=()):
+        return Histogram(self, name, documentation, labelnames, buckets)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: [[list(key), value] for key, value in metric.values.items()]
+                for name, metric in self.metrics.items()
+            }
+
+    def flush(self, force=False):
+        """
+        Writes values of this process to `METRICS_MULTIPROCESS_DIR`, at most once per
+        `flush_interval` seconds unless `force` is True.
+
+        Values which can not be written yet are written by a timer when the interval is over,
+        so they are not missing from the totals when the process gets no more requests.
+        """
+        directory = settings.METRICS_MULTIPROCESS_DIR
+        if not directory:
+            return
+
+        with self.flush_lock:
+            delay = self.last_flush + self.flush_interval - time.monotonic()
+            if not force and delay > 0:
+                # Timers do not survive forks, so a timer of the parent process is not alive.
+                if self.flush_timer is None or not self.flush_timer.is_alive():
+                    self.flush_timer = threading.Timer(
+                        delay, self.flush, kwargs={"force": True}
+                    )
+                    self.flush_timer.daemon = True
+                    self.flush_timer.start()
+                return
+            self.last_flush = time.monotonic()
+            # The values observed so far are written now, later ones need a new timer.
+            self.flush_timer = None
+
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False
+        ) as file:
+            json.dump(self.snapshot(), file)
+        os.replace(file.name, os.path.join(directory, self.file_name))
+
+    def collect(self):
+        """
+        Returns values of all metrics, summed over all the processes when multiprocess mode is used.
+        """
+        directory = settings.METRICS_MULTIPROCESS_DIR
+        if not directory:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush(force=True)
+            snapshots = []
+            for file_name in os.listdir(directory):
+                if file_name.endswith(".json"):
+                    try:
+                        with open(os.path.join(directory, file_name)) as file:
+                            snapshots.append(json.load(file))
+                    except (OSError, ValueError):
+                        continue
+
+        values = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            for name, samples in snapshot.items():
+                if name in self.metrics:
+                    self.metrics[name].merge(
+                        values[name], {tuple(key): value for key, value in samples}
+                    )
+        return values
+
+    def render(self):
+        values = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.extend(metric.render(values[name]))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+http_requests_total = REGISTRY.counter(
+    "http_requests_total",
+    "Total number of HTTP requests.",
+    ["view", "method", "status"],
+)
+http_request_duration_seconds = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Duration of HTTP requests in seconds.",
+    ["view", "method"],
+    buckets=REQUEST_DURATION_BUCKETS,
+)
+db_queries_per_request = REGISTRY.histogram(
+    "db_queries_per_request",
+    "Number of database queries executed by a request.",
+    ["view", "method"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200),
+)
+db_duration_seconds = REGISTRY.histogram(
+    "db_duration_seconds",
+    "Time spent in the database by a request in seconds.",
+    ["view", "method"],
+    buckets=REQUEST_DURATION_BUCKETS,
+)
+cache_requests_total = REGISTRY.counter(
+    "cache_requests_total",
+    "Total number of cache lookups, hit ratio is hits divided by all lookups.",
+    ["cache", "result"],
+)
+
+
+def record_cache_access(cache, hit):
+    """
+    Records a lookup in one of the project's caches, so that its hit ratio can be computed.
+    """
+    cache_requests_total.inc(cache=cache, result="hit" if hit else "miss")
@@ -0,0 +1,430 @@
+import hashlib
+import logging
+import time
+import warnings
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from . import metrics
+from .compression import CODECS, choose_encoding
+from .instrumentation import collect_metrics, current_metrics, wrap_queries
+from .routers import areplica_reads, replica_reads
+from .querybudget import (
+    DuplicateQueriesWarning,
+    QueryBudgetExceeded,
+    QueryLog,
+    load_budgets,
+    record_budget,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def is_token_api_request(request):
+    return request.path_info.startswith(tuple(settings.TOKEN_API_PATH_PREFIXES))
+
+
+def skip_for_token_api(middleware_class):
+    """
+    Returns a subclass of the Django middleware class (based on `MiddlewareMixin`) which does
+    nothing for requests to the token authenticated API (`TOKEN_API_PATH_PREFIXES`), which
+    never use sessions, messages or CSRF protection, and works as before for other requests
+    (for example to the admin site).
+    """
+
+    def process_request(self, request):
+        if not is_token_api_request(request):
+            return middleware_class.process_request(self, request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not is_token_api_request(request):
+            return middleware_class.process_view(
+                self, request, view_func, view_args, view_kwargs
+            )
+
+    def process_response(self, request, response):
+        if is_token_api_request(request):
+            return response
+        return middleware_class.process_response(self, request, response)
+
+    hooks = {
+        name: hook
+        for name, hook in [
+            ("process_request", process_request),
+            ("process_view", process_view),
+            ("process_response", process_response),
+        ]
+        if hasattr(middleware_class, name)
+    }
+    return type(middleware_class.__name__, (middleware_class,), hooks)
+
+
+TokenAPISessionMiddleware = skip_for_token_api(SessionMiddleware)
+TokenAPICsrfViewMiddleware = skip_for_token_api(CsrfViewMiddleware)
+TokenAPIAuthenticationMiddleware = skip_for_token_api(AuthenticationMiddleware)
+TokenAPIMessageMiddleware = skip_for_token_api(MessageMiddleware)
+
+
+def show_debug_toolbar(request):
+    """
+    Shows the debug toolbar like it does by default, except for the token authenticated API,
+    whose JSON responses have no place for the toolbar, so collecting its data only slows
+    the requests down.
+    """
+    from debug_toolbar.middleware import show_toolbar
+
+    return not is_token_api_request(request) and show_toolbar(request)
+
+
+class SyncAndAsyncMiddleware:
+    """
+    Base of middleware which works in both synchronous and asynchronous middleware chains, like
+    `MiddlewareMixin`. Under ASGI a synchronous middleware makes Django run the rest of the chain,
+    async views included, in a thread.
+
+    Subclasses implement `handle()` and its async version `ahandle()`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self.get_response):
+            return self.ahandle(request)
+        return self.handle(request)
+
+
+class RequestMetricsMiddleware(SyncAndAsyncMiddleware):
+    """
+    Records number of database queries, time spent in the database, in the view and in serializers
+    for every request, and sends them to the client in the `Server-Timing` header, for example:
+
+    `Server-Timing: db;dur=4.1;desc="3 queries", serializer;dur=1.2, view;dur=7.9, total;dur=8.3`
+
+    Requests slower than `REQUEST_METRICS_SLOW_REQUEST_MS` or executing more queries than
+    `REQUEST_METRICS_SLOW_QUERY_COUNT` are logged with all the metrics as structured data.
+
+    The middleware is removed from the middleware chain when `REQUEST_METRICS_ENABLED` is False,
+    so it has no overhead when it is disabled. It should be the first middleware in `MIDDLEWARE`.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        start = time.perf_counter()
+        with collect_metrics() as metrics:
+            response = self.get_response(request)
+        self.record(request, response, metrics, start)
+        return response
+
+    async def ahandle(self, request):
+        start = time.perf_counter()
+        with collect_metrics() as metrics:
+            response = await self.get_response(request)
+        self.record(request, response, metrics, start)
+        return response
+
+    def record(self, request, response, metrics, start):
+        end = time.perf_counter()
+        if metrics.view_start is not None:
+            metrics.add_time("view", end - metrics.view_start)
+        metrics.add_time("total", end - start)
+
+        response["Server-Timing"] = self.server_timing(metrics)
+        self.log_slow_request(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.view_start = time.perf_counter()
+
+    def server_timing(self, metrics):
+        entries = [
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.query_count} queries"'
+        ]
+        entries.extend(
+            f"{name};dur={seconds * 1000:.1f}"
+            for name, seconds in metrics.timings.items()
+        )
+        return ", ".join(entries)
+
+    def log_slow_request(self, request, response, metrics):
+        total_ms = metrics.timings["total"] * 1000
+        if (
+            total_ms < settings.REQUEST_METRICS_SLOW_REQUEST_MS
+            and metrics.query_count <= settings.REQUEST_METRICS_SLOW_QUERY_COUNT
+        ):
+            return
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "query_count": metrics.query_count,
+            "db_ms": round(metrics.db_time * 1000, 1),
+            **{
+                f"{name}_ms": round(seconds * 1000, 1)
+                for name, seconds in metrics.timings.items()
+            },
+        }
+        logger.warning(
+            "Slow request: %s %s took %.1f ms with %d queries",
+            request.method,
+            request.path,
+            total_ms,
+            metrics.query_count,
+            extra={"request_metrics": record},
+        )
+
+
+class MetricsMiddleware(SyncAndAsyncMiddleware):
+    """
+    Records number of requests, their duration, number of database queries and time spent in the
+    database for every view (labelled with the URL name and the HTTP method) in the metrics registry,
+    which is exposed on the `/metrics` endpoint.
+
+    The middleware is removed from the middleware chain when `METRICS_ENABLED` is False.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        start = time.perf_counter()
+        with collect_metrics() as request_metrics:
+            query_count = request_metrics.query_count
+            db_time = request_metrics.db_time
+            response = self.get_response(request)
+        self.observe(request, response, request_metrics, query_count, db_time, start)
+        return response
+
+    async def ahandle(self, request):
+        start = time.perf_counter()
+        with collect_metrics() as request_metrics:
+            query_count = request_metrics.query_count
+            db_time = request_metrics.db_time
+            response = await self.get_response(request)
+        self.observe(request, response, request_metrics, query_count, db_time, start)
+        return response
+
+    def observe(self, request, response, request_metrics, query_count, db_time, start):
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        labels = {
+            "view": match.view_name if match else "unmatched",
+            "method": request.method,
+        }
+        metrics.http_requests_total.inc(status=response.status_code, **labels)
+        metrics.http_request_duration_seconds.observe(duration, **labels)
+        metrics.db_queries_per_request.observe(
+            request_metrics.query_count - query_count, **labels
+        )
+        metrics.db_duration_seconds.observe(request_metrics.db_time - db_time, **labels)
+        metrics.REGISTRY.flush()
+
+
+class QueryBudgetMiddleware(SyncAndAsyncMiddleware):
+    """
+    Used by the tests (see `book_giveaway.settings.test`): fails requests which execute more
+    database queries than the budget of their endpoint in `QUERY_BUDGETS_FILE` (or when the
+    endpoint has no budget) and warns about identical queries executed more than once by a request.
+
+    With `QUERY_BUDGETS_RECORD` requests never fail, instead the largest numbers of queries of the
+    endpoints are written to the file when the tests finish.
+
+    Queries executed while streamed responses are sent are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGETS_FILE:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        query_log = QueryLog()
+        with wrap_queries(query_log):
+            response = self.get_response(request)
+        self.check_request(request, query_log)
+        return response
+
+    async def ahandle(self, request):
+        query_log = QueryLog()
+        with wrap_queries(query_log):
+            response = await self.get_response(request)
+        self.check_request(request, query_log)
+        return response
+
+    def check_request(self, request, query_log):
+        match = request.resolver_match
+        if match is not None:
+            self.check_budget(f"{match.view_name} {request.method}", query_log)
+
+    def check_budget(self, key, query_log):
+        path = settings.QUERY_BUDGETS_FILE
+        query_count = len(query_log.queries)
+
+        if settings.QUERY_BUDGETS_RECORD:
+            record_budget(path, key, query_count)
+            return
+
+        budget = load_budgets(path).get(key)
+        if budget is None:
+            raise QueryBudgetExceeded(
+                f"{key} executed {query_count} queries and has no query budget in {path}."
+            )
+        if query_count > budget:
+            raise QueryBudgetExceeded(
+                f"{key} executed {query_count} queries, its budget is {budget}:\n"
+                + "\n".join(sql for sql, params in query_log.queries)
+            )
+
+        duplicates = query_log.duplicates()
+        if duplicates:
+            warnings.warn(
+                f"{key} executed identical queries more than once:\n"
+                + "\n".join(duplicates),
+                DuplicateQueriesWarning,
+            )
+
+
+class ReplicaRoutingMiddleware(SyncAndAsyncMiddleware):
+    """
+    Sends database reads of requests with safe methods to the read replicas
+    (`DATABASE_REPLICAS`, see `book_giveaway.routers`). Requests with other methods use the
+    primary database only.
+
+    After a successful write the client (identified by its `Authorization` header or session
+    cookie) reads from the primary database for `REPLICA_PIN_SECONDS`, so it sees its own
+    writes even when the replicas lag behind. Pins are kept in the default cache, which has to
+    be shared by all server processes for them to work across processes.
+
+    The middleware is removed from the middleware chain when there are no replicas.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        pin_key = self.pin_key(request)
+
+        if request.method in self.SAFE_METHODS:
+            if pin_key is not None and cache.get(pin_key):
+                return self.get_response(request)
+            with replica_reads():
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        if pin_key is not None and response.status_code < 400:
+            cache.set(pin_key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def ahandle(self, request):
+        pin_key = self.pin_key(request)
+
+        if request.method in self.SAFE_METHODS:
+            if pin_key is not None and await cache.aget(pin_key):
+                return await self.get_response(request)
+            async with areplica_reads():
+                return await self.get_response(request)
+
+        response = await self.get_response(request)
+        if pin_key is not None and response.status_code < 400:
+            await cache.aset(pin_key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def pin_key(self, request):
+        credentials = request.headers.get("Authorization") or request.COOKIES.get(
+            settings.SESSION_COOKIE_NAME
+        )
+        if not credentials:
+            return None
+        return "replica-pin:" + hashlib.sha256(credentials.encode()).hexdigest()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses responses of the API (`TOKEN_API_PATH_PREFIXES`) with the content coding the client
+    prefers of gzip, brotli and zstd (see `book_giveaway.compression`). Responses smaller than
+    `COMPRESSION_MIN_SIZE` bytes are sent as they are, streamed responses are compressed chunk by
+    chunk.
+
+    Only textual content is compressed (images are already compressed), responses which already
+    have a content coding, like the cached schema, are left alone. Other pages, like the admin,
+    are not compressed, because compressing secrets next to reflected input exposes them to
+    BREACH attacks.
+
+    ETags of compressed responses are made weak, like `GZipMiddleware` does, because the
+    compressed and identity representations are not the same bytes. `ConditionalRequestMixin`
+    accepts the weak ETags in If-Match.
+    """
+
+    COMPRESSIBLE_CONTENT_TYPES = (
+        "application/json",
+        "application/javascript",
+        "application/vnd.oai.openapi",
+        "application/x-ndjson",
+        "application/xml",
+        "text/",
+    )
+
+    def process_response(self, request, response):
+        if not self.should_compress(request, response):
+            return response
+
+        patch_vary_headers(response, ["Accept-Encoding"])
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        codec = CODECS[encoding]
+        if response.streaming:
+            response.streaming_content = codec.compress_stream(
+                response.streaming_content
+            )
+            del response["Content-Length"]
+        else:
+            content = codec.compress(response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response["Content-Length"] = str(len(content))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+    def should_compress(self, request, response):
+        return (
+            is_token_api_request(request)
+            and not response.has_header("Content-Encoding")
+            and response.get("Content-Type", "").startswith(
+                self.COMPRESSIBLE_CONTENT_TYPES
+            )
+            and "no-transform" not in response.get("Cache-Control", "")
+            and (
+                response.streaming
+                or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+            )
+        )
@@ -0,0 +1,26 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from . import fastjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    `JSONParser` which decodes with orjson when it is available (see `book_giveaway.fastjson`).
+
+    Bodies in other encodings than UTF-8 and JSON with NaN and infinite numbers (without
+    `STRICT_JSON`) are decoded by `JSONParser`.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if (
+            not fastjson.use_orjson()
+            or not self.strict
+            or encoding.lower().replace("_", "-") not in ("utf-8", "utf8")
+        ):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return fastjson.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,101 @@
+"""
+Query budgets of the API endpoints, enforced in the tests by `QueryBudgetMiddleware`.
+
+Budgets are the maximum numbers of database queries that one request to an endpoint can execute,
+stored in a checked-in JSON file (`QUERY_BUDGETS_FILE` setting) under "<URL name> <HTTP method>"
+keys, for example `{"books-list GET": 2}`.
+
+After intended changes of the number of queries, the file can be regenerated from the queries
+executed by the tests:
+
+    QUERY_BUDGETS_RECORD=true python manage.py test
+
+Every test process writes only the budgets of its own requests, so budgets have to be recorded
+without running the tests in parallel.
+"""
+
+import atexit
+import json
+from collections import Counter
+from functools import lru_cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class DuplicateQueriesWarning(UserWarning):
+    pass
+
+
+class QueryLog:
+    """
+    Database execute wrapper which keeps SQL and parameters of every executed query.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, repr(params)))
+        return execute(sql, params, many, context)
+
+    def duplicates(self):
+        """
+        Returns SQL of the queries that were executed more than once with the same parameters.
+        """
+        return [
+            sql for (sql, params), count in Counter(self.queries).items() if count > 1
+        ]
+
+
+@lru_cache(maxsize=None)
+def load_budgets(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+# Maximum numbers of queries of every endpoint executed in this process, for every budgets file,
+# when budgets are recorded.
+recorded_budgets = {}
+
+
+def record_budget(path, key, query_count):
+    if path not in recorded_budgets:
+        recorded_budgets[path] = {}
+        atexit.register(write_budgets, path)
+    budgets = recorded_budgets[path]
+    budgets[key] = max(budgets.get(key, 0), query_count)
+
+
+def write_budgets(path):
+    budgets = {**load_budgets(path), **recorded_budgets[path]}
+    with open(path, "w") as file:
+        json.dump(dict(sorted(budgets.items())), file, indent=2)
+        file.write("\n")
+
+
+class QueryBudgetTestMixin:
+    """
+    Mixin for test cases with assertions about the number of queries of API requests.
+    """
+
+    def assertQueriesDoNotGrow(self, make_request, add_objects):
+        """
+        Checks that the request executes the same number of queries after more objects are
+        added by `add_objects()`, which catches queries executed for every object (N+1 queries).
+        """
+        with CaptureQueriesContext(connection) as before:
+            make_request()
+        add_objects()
+        with CaptureQueriesContext(connection) as after:
+            make_request()
+
+        self.assertEqual(
+            len(after),
+            len(before),
+            "Number of queries grows with the number of objects:\n"
+            + "\n".join(query["sql"] for query in after.captured_queries),
+        )
@@ -0,0 +1,102 @@
+import csv
+import io
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from . import fastjson
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` which encodes with orjson when it is available (see `book_giveaway.fastjson`).
+
+    Indented JSON (of the browsable API and of `Accept: application/json; indent=4`) and JSON
+    with NaN and infinite numbers (without `STRICT_JSON`) are encoded by `JSONRenderer`.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            not fastjson.use_orjson()
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        # The same escaping as `JSONRenderer`, so the JSON is a strict subset of JavaScript.
+        return (
+            fastjson.dumps(data)
+            .replace("\u2028".encode(), b"\\u2028")
+            .replace("\u2029".encode(), b"\\u2029")
+        )
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renders rows as newline delimited JSON, one JSON object per line.
+
+    `render_chunks()` encodes chunks of rows lazily, so it can be used with `StreamingHttpResponse`.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = [data] if isinstance(data, dict) else data
+        return b"".join(self.render_chunks([rows]))
+
+    def render_chunks(self, chunks, fieldnames=None):
+        for rows in chunks:
+            yield b"".join(fastjson.dumps(row) + b"\n" for row in rows)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renders rows as CSV with a header line. List values are joined with `list_separator`.
+
+    `render_chunks()` encodes chunks of rows lazily, so it can be used with `StreamingHttpResponse`.
+    With `fieldnames`, the header line is written even when there are no rows.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    list_separator = ";"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = [data] if isinstance(data, dict) else data
+        return b"".join(self.render_chunks([rows]))
+
+    def render_chunks(self, chunks, fieldnames=None):
+        buffer = io.StringIO()
+        writer = None
+        if fieldnames:
+            writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+            writer.writeheader()
+
+        for rows in chunks:
+            for row in rows:
+                if writer is None:
+                    writer = csv.DictWriter(buffer, fieldnames=list(row))
+                    writer.writeheader()
+                writer.writerow(
+                    {
+                        key: (
+                            self.list_separator.join(value)
+                            if isinstance(value, list)
+                            else value
+                        )
+                        for key, value in row.items()
+                    }
+                )
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        # Only the header line is left when there were no chunks.
+        if buffer.getvalue():
+            yield buffer.getvalue().encode()
@@ -0,0 +1,105 @@
+"""
+Routing of database queries between the primary database and its read replicas.
+
+Queries are sent to the primary ("default") database, except for reads made inside
+`replica_reads()`, which `ReplicaRoutingMiddleware` uses for requests with safe methods of
+clients who have not written recently. All the reads of a block go to the same replica, so a
+request never mixes data of replicas with different lag. A replica which can not be connected to is not used for
+`REPLICA_RETRY_SECONDS`, its reads are sent to another replica or to the primary meanwhile.
+"""
+
+import logging
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "default"
+
+# Tokens and sessions are read right after they are created by logins, so a replica lagging
+# behind would reject the credentials.
+PRIMARY_APPS = {"authtoken", "sessions"}
+
+# Alias of the database that reads inside `replica_reads()` are sent to.
+_read_database = ContextVar("read_database", default=None)
+
+# Alias of a replica: monotonic time until which it is not used, after failed connections.
+_unavailable_until = {}
+
+
+@contextmanager
+def replica_reads():
+    """
+    Sends reads in the block (and in threads and tasks started from it) to a read replica, chosen
+    once for the whole block, or to the primary when no replica is available.
+    """
+    token = _read_database.set(choose_replica() or PRIMARY)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+@asynccontextmanager
+async def areplica_reads():
+    """
+    Async version of `replica_reads()`, the connection to the chosen replica is checked in a thread.
+    """
+    token = _read_database.set(await sync_to_async(choose_replica)() or PRIMARY)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def choose_replica():
+    """
+    Returns the alias of a random available replica, or None when no replica is available.
+    """
+    now = time.monotonic()
+    replicas = [
+        alias
+        for alias in settings.DATABASE_REPLICAS
+        if alias in settings.DATABASES and _unavailable_until.get(alias, 0) <= now
+    ]
+    for alias in random.sample(replicas, len(replicas)):
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError:
+            logger.warning(
+                "Read replica %s is not available, reading from other databases.",
+                alias,
+                exc_info=True,
+            )
+            _unavailable_until[alias] = now + settings.REPLICA_RETRY_SECONDS
+            continue
+        return alias
+    return None
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads inside `replica_reads()` to the read replicas
+    (`DATABASE_REPLICAS`) and everything else to the primary database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_APPS:
+            return PRIMARY
+        return _read_database.get() or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # All the databases have the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema from the primary.
+        return db == PRIMARY
@@ -0,0 +1,132 @@
+"""
+Cache of the OpenAPI schema of the API.
+
+Generating the schema introspects every view and serializer, so it is done once per version of
+the code: the schema is kept in memory of the process and, when `SCHEMA_CACHE_DIR` is set, in a
+JSON file named after the code version, which is shared by the server processes and can be
+generated before the server starts with `manage.py generate_schema`.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from .metrics import record_cache_access
+
+# (API version, language): schema, for the schemas used by this process.
+_schemas = {}
+
+# (API version, language, renderer format): RenderedSchema.
+_rendered_schemas = {}
+
+
+class RenderedSchema:
+    """
+    Schema rendered in one format, also compressed with gzip, with ETags of both versions.
+    """
+
+    def __init__(self, content):
+        self.content = content
+        self.gzipped_content = gzip.compress(content, mtime=0)
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzipped_etag = f'"{digest}-gzip"'
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    Digest of everything the schema is generated from: the source code of the project's apps
+    and settings, and the versions of the libraries generating it.
+    """
+    digest = hashlib.sha256()
+    for package in ("django", "djangorestframework", "drf-spectacular"):
+        digest.update(metadata.version(package).encode())
+
+    base_dir = Path(settings.BASE_DIR)
+    directories = {base_dir / "book_giveaway"} | {
+        Path(config.path)
+        for config in apps.get_app_configs()
+        if Path(config.path).is_relative_to(base_dir)
+    }
+    for directory in sorted(directories):
+        for path in sorted(directory.rglob("*.py")):
+            digest.update(str(path.relative_to(base_dir)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def cache_file(api_version=None, lang=None):
+    name = "-".join(
+        part for part in ("schema", code_version(), api_version, lang) if part
+    )
+    return Path(settings.SCHEMA_CACHE_DIR) / f"{name}.json"
+
+
+def get_schema(generate, api_version=None, lang=None):
+    """
+    Returns the cached schema, or the schema made by `generate()`, which is cached then.
+    """
+    key = (api_version, lang)
+    if key in _schemas:
+        return _schemas[key]
+
+    if not settings.SCHEMA_CACHE_DIR:
+        # A round trip through JSON, so the schema is the same whichever cache it comes from.
+        schema = json.loads(OpenApiJsonRenderer().render(generate()))
+    else:
+        path = cache_file(api_version, lang)
+        if not path.exists():
+            write_schema(generate, api_version, lang)
+        schema = json.loads(path.read_bytes())
+
+    _schemas[key] = schema
+    return schema
+
+
+def write_schema(generate, api_version=None, lang=None):
+    """
+    Writes the schema made by `generate()` to the cache file, returns the path of the file.
+    """
+    path = cache_file(api_version, lang)
+    write_file(path, OpenApiJsonRenderer().render(generate()))
+    return path
+
+
+def render_schema(renderer, generate, api_version=None, lang=None):
+    """
+    Returns `RenderedSchema` of the schema rendered by the renderer, rendered only once.
+    """
+    key = (api_version, lang, renderer.format)
+    rendered = _rendered_schemas.get(key)
+    record_cache_access("schema", rendered is not None)
+    if rendered is None:
+        schema = get_schema(generate, api_version, lang)
+        rendered = _rendered_schemas[key] = RenderedSchema(renderer.render(schema))
+    return rendered
+
+
+def write_file(path, content):
+    """
+    Replaces the file atomically, so other processes never read a partially written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(content)
+    os.replace(temporary_path, path)
+
+
+def clear_cache():
+    """
+    Clears the memory cache of this process (the files stay).
+    """
+    _schemas.clear()
+    _rendered_schemas.clear()
@@ -0,0 +1,114 @@
+"""
+Production server of book_giveaway project: gunicorn with several worker processes serving
+`book_giveaway.wsgi` with a thread pool in every worker, or `book_giveaway.asgi` with uvicorn workers.
+
+Usage: python -m book_giveaway.server
+
+The server is configured with environment variables (or the environment-variables.env file):
+
+* `SERVER_BIND` - address to listen on, "0.0.0.0:8000" by default.
+* `SERVER_WORKERS` - number of worker processes, 2 * CPUs + 1 by default.
+* `SERVER_THREADS` - number of threads of every WSGI worker, 4 by default.
+* `SERVER_ASGI` - serve `book_giveaway.asgi` with uvicorn workers instead of WSGI. Django 4.0
+  can not stream responses read from the database under ASGI, so streamed lists of books are sent
+  whole and book exports are read into memory before they are sent.
+* `SERVER_PRELOAD` - load the project once before forking the workers (faster start and memory
+  shared between the workers), true by default.
+* `SERVER_KEEPALIVE` - seconds to keep idle connections open, should be longer than the idle
+  timeout of the load balancer in front of the server, 5 by default.
+* `SERVER_TIMEOUT` - workers that are silent for longer are killed and restarted, 30 by default.
+* `SERVER_GRACEFUL_TIMEOUT` - seconds given to workers to finish their requests on restart, 30 by
+  default.
+* `SERVER_MAX_REQUESTS` - restart workers after this many requests (0 means never), the restarts are
+  spread by `SERVER_MAX_REQUESTS_JITTER`.
+
+Graceful reload: `kill -HUP <pid of the server>` starts new workers and stops the old ones once they
+finish the requests they are processing. With `SERVER_PRELOAD` the project code is loaded only once,
+so new code needs a restart of the server.
+"""
+
+import multiprocessing
+import os
+import tempfile
+from environs import Env
+from gunicorn.app.base import BaseApplication
+
+
+def get_options(env):
+    asgi = env.bool("SERVER_ASGI", default=False)
+    threads = env.int("SERVER_THREADS", default=4)
+    if asgi:
+        worker_class = "uvicorn.workers.UvicornWorker"
+    else:
+        worker_class = "gthread" if threads > 1 else "sync"
+
+    return {
+        "bind": env.str("SERVER_BIND", default="0.0.0.0:8000"),
+        "workers": env.int(
+            "SERVER_WORKERS", default=multiprocessing.cpu_count() * 2 + 1
+        ),
+        "threads": threads,
+        "worker_class": worker_class,
+        "preload_app": env.bool("SERVER_PRELOAD", default=True),
+        "keepalive": env.int("SERVER_KEEPALIVE", default=5),
+        "timeout": env.int("SERVER_TIMEOUT", default=30),
+        "graceful_timeout": env.int("SERVER_GRACEFUL_TIMEOUT", default=30),
+        "max_requests": env.int("SERVER_MAX_REQUESTS", default=0),
+        "max_requests_jitter": env.int("SERVER_MAX_REQUESTS_JITTER", default=0),
+        "accesslog": "-",
+        "post_fork": post_fork,
+        "worker_exit": worker_exit,
+    }
+
+
+def post_fork(server, worker):
+    # Database connections must never be shared between processes. Preloading does not open any,
+    # but closing them makes sure that every worker opens its own.
+    from django.db import connections
+
+    connections.close_all()
+
+
+def worker_exit(server, worker):
+    # Called in the worker process, for example when it is restarted after `max_requests`. Metrics
+    # observed since its last write to METRICS_MULTIPROCESS_DIR would be lost with the process.
+    from book_giveaway import metrics
+
+    metrics.REGISTRY.flush(force=True)
+
+
+class Server(BaseApplication):
+    def __init__(self, options, asgi=False):
+        self.options = options
+        self.asgi = asgi
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        if self.asgi:
+            from book_giveaway.asgi import application
+        else:
+            from book_giveaway.wsgi import application
+        return application
+
+
+def main():
+    env = Env()
+    env.read_env()
+    options = get_options(env)
+
+    # Every worker keeps its own metrics, /metrics sums them from files in a shared directory.
+    if options["workers"] > 1:
+        os.environ.setdefault(
+            "METRICS_MULTIPROCESS_DIR",
+            tempfile.mkdtemp(prefix="book_giveaway_metrics_"),
+        )
+
+    Server(options, asgi=env.bool("SERVER_ASGI", default=False)).run()
+
+
+if __name__ == "__main__":
+    main()
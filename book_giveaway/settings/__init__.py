@@ -0,0 +1,9 @@
+"""
+Settings profiles of book_giveaway project:
+
+* `book_giveaway.settings.dev` - local development with the debug toolbar, used by `manage.py`.
+* `book_giveaway.settings.test` - running the tests, used by `manage.py test`.
+* `book_giveaway.settings.prod` - serving the project, used by `wsgi.py` and `asgi.py`.
+
+The profile can always be chosen with the `DJANGO_SETTINGS_MODULE` environment variable.
+"""
@@ -0,0 +1,307 @@
+"""
+Django settings shared by all the profiles (dev, test and prod) of book_giveaway project.
+
+Generated by 'django-admin startproject' using Django 4.0.10.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.0/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/4.0/ref/settings/
+"""
+
+from pathlib import Path
+from environs import Env
+
+env = Env()
+env.read_env()
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/4.0/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = env("SECRET_KEY")
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = env.bool("DEBUG", default=False)
+
+ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "django.contrib.postgres",
+    # 3rd party apps
+    "rest_framework",
+    "rest_framework.authtoken",
+    "dj_rest_auth",
+    "drf_spectacular",
+    "django_filters",
+    # Local apps
+    "accounts.apps.AccountsConfig",
+    "books.apps.BooksConfig",
+    "bookingrequests.apps.BookingrequestsConfig",
+    # Django cleanup
+    "django_cleanup.apps.CleanupConfig",
+]
+
+MIDDLEWARE = [
+    "book_giveaway.middleware.RequestMetricsMiddleware",
+    "book_giveaway.middleware.MetricsMiddleware",
+    "book_giveaway.middleware.ReplicaRoutingMiddleware",
+    "book_giveaway.middleware.CompressionMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "book_giveaway.middleware.TokenAPISessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "book_giveaway.middleware.TokenAPICsrfViewMiddleware",
+    "book_giveaway.middleware.TokenAPIAuthenticationMiddleware",
+    "book_giveaway.middleware.TokenAPIMessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+# URL path prefixes of the API, which authenticates with tokens only, so the session, CSRF,
+# authentication and messages middleware are skipped for it (they still run for the admin).
+TOKEN_API_PATH_PREFIXES = ["/api/"]
+
+ROOT_URLCONF = "book_giveaway.urls"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "book_giveaway.wsgi.application"
+
+
+# Database
+# https://docs.djangoproject.com/en/4.0/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env("NAME"),
+        "USER": env("USER"),
+        "PASSWORD": env("PASSWORD"),
+        "HOST": "db",
+        "PORT": 5432,
+    }
+}
+
+# Hosts of read replicas of the database (with the same name and credentials). Reads of
+# requests with safe methods are spread over them, see book_giveaway/routers.py.
+DATABASE_REPLICA_HOSTS = env.list("DATABASE_REPLICA_HOSTS", default=[])
+
+# Aliases of the databases used by ReplicaRouter for reads.
+DATABASE_REPLICAS = []
+for number, host in enumerate(DATABASE_REPLICA_HOSTS, start=1):
+    DATABASE_REPLICAS.append(f"replica{number}")
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["book_giveaway.routers.ReplicaRouter"] if DATABASE_REPLICAS else []
+
+# Seconds for which clients read from the primary database after they write, so that they see
+# their writes while replicas catch up. Needs a cache shared by the server processes.
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=5)
+
+# Seconds for which a replica which could not be connected to is not used.
+REPLICA_RETRY_SECONDS = env.int("REPLICA_RETRY_SECONDS", default=30)
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/4.0/topics/auth/passwords/
+
+# Algorithm of new password hashes ("pbkdf2_sha256", "scrypt" or "argon2", which requires the
+# argon2-cffi package) and its cost, which is a trade-off between logins per second per CPU core
+# and resistance to brute force. Hashes made with other algorithms or costs stay valid and are
+# upgraded when their users log in.
+PASSWORD_HASHER = env.str("PASSWORD_HASHER", default="pbkdf2_sha256")
+PASSWORD_PBKDF2_ITERATIONS = env.int("PASSWORD_PBKDF2_ITERATIONS", default=320000)
+PASSWORD_SCRYPT_WORK_FACTOR = env.int("PASSWORD_SCRYPT_WORK_FACTOR", default=2**14)
+PASSWORD_ARGON2_TIME_COST = env.int("PASSWORD_ARGON2_TIME_COST", default=2)
+PASSWORD_ARGON2_MEMORY_COST = env.int("PASSWORD_ARGON2_MEMORY_COST", default=102400)
+
+TUNABLE_PASSWORD_HASHERS = {
+    "pbkdf2_sha256": "accounts.hashers.PBKDF2PasswordHasher",
+    "scrypt": "accounts.hashers.ScryptPasswordHasher",
+    "argon2": "accounts.hashers.Argon2PasswordHasher",
+}
+PASSWORD_HASHERS = [
+    TUNABLE_PASSWORD_HASHERS[PASSWORD_HASHER],
+    *(
+        hasher
+        for algorithm, hasher in TUNABLE_PASSWORD_HASHERS.items()
+        if algorithm != PASSWORD_HASHER
+    ),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
+
+# Password validation
+# https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/4.0/topics/i18n/
+
+LANGUAGE_CODE = "en-us"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/4.0/howto/static-files/
+
+STATIC_URL = "static/"
+
+MEDIA_URL = "/media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Store book covers under the digest of their content, so that identical covers are stored only once.
+BOOK_COVER_DEDUPLICATION = env.bool("BOOK_COVER_DEDUPLICATION", default=False)
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+AUTH_USER_MODEL = "accounts.CustomUser"
+
+
+# Library encoding and decoding JSON of the API: "orjson" (used when the orjson package is
+# installed) or "json" (the standard library).
+JSON_BACKEND = env.str("JSON_BACKEND", default="orjson")
+
+REST_FRAMEWORK = {
+    "DEFAULT_PERMISSION_CLASSES": [
+        "rest_framework.permissions.IsAuthenticated",
+    ],
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.TokenAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "book_giveaway.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "book_giveaway.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+}
+
+# Query count and timings of requests in the Server-Timing header and logs of slow requests.
+REQUEST_METRICS_ENABLED = env.bool("REQUEST_METRICS_ENABLED", default=False)
+REQUEST_METRICS_SLOW_REQUEST_MS = env.int(
+    "REQUEST_METRICS_SLOW_REQUEST_MS", default=500
+)
+REQUEST_METRICS_SLOW_QUERY_COUNT = env.int(
+    "REQUEST_METRICS_SLOW_QUERY_COUNT", default=50
+)
+
+# Metrics of requests exposed on /metrics in Prometheus text format. When the project is served by
+# several processes, METRICS_MULTIPROCESS_DIR should point to a directory shared by all of them.
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=False)
+METRICS_MULTIPROCESS_DIR = env.str("METRICS_MULTIPROCESS_DIR", default="")
+# /metrics only answers clients from METRICS_ALLOWED_IPS (addresses or networks) and clients
+# sending METRICS_TOKEN as a bearer token, when it is set.
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"])
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+
+# File with query budgets of the API endpoints, checked by the tests (see settings/test.py).
+QUERY_BUDGETS_FILE = None
+QUERY_BUDGETS_RECORD = False
+
+# Serve list and retrieve requests of books, authors and genres with async views (under ASGI).
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", default=False)
+
+# Number of objects fetched from the database and serialized at once by streaming list responses.
+STREAMING_CHUNK_SIZE = env.int("STREAMING_CHUNK_SIZE", default=500)
+
+# Compression of API responses of at least COMPRESSION_MIN_SIZE bytes with the content coding the
+# client prefers, of COMPRESSION_ENCODINGS in the order of preference of the server ("br" needs the
+# brotli package and "zstd" the zstandard package). Higher levels compress better and use more CPU
+# time, compare them with `python -m benchmarks.compression`.
+COMPRESSION_MIN_SIZE = env.int("COMPRESSION_MIN_SIZE", default=1024)
+COMPRESSION_ENCODINGS = env.list(
+    "COMPRESSION_ENCODINGS", default=["zstd", "br", "gzip"]
+)
+COMPRESSION_GZIP_LEVEL = env.int("COMPRESSION_GZIP_LEVEL", default=6)
+COMPRESSION_BROTLI_QUALITY = env.int("COMPRESSION_BROTLI_QUALITY", default=4)
+COMPRESSION_ZSTD_LEVEL = env.int("COMPRESSION_ZSTD_LEVEL", default=3)
+
+# Maximum number of requests of a batch request (/api/batch/) and of threads running its requests
+# with safe methods concurrently.
+BATCH_MAX_REQUESTS = env.int("BATCH_MAX_REQUESTS", default=20)
+BATCH_MAX_WORKERS = env.int("BATCH_MAX_WORKERS", default=4)
+
+REST_AUTH = {
+    "LOGIN_SERIALIZER": "accounts.serializers.LoginSerializer",  # Using my own serializer defined in accounts/serializers.py.
+    # Clients authenticate with the returned token, the API has no sessions.
+    "SESSION_LOGIN": False,
+}
+
+SPECTACULAR_SETTINGS = {
+    "TITLE": "Book Giveaway API Project",
+    "DESCRIPTION": """RESTful API for a Book Giveaway Service where registered users 
+    can offer books for free and also take books that are offered by others.""",
+    "VERSION": "1.0.0",
+    "COMPONENT_SPLIT_REQUEST": True,
+    # Files of an exact version of Swagger UI are served by the CDN as immutable (cached for a
+    # year by browsers), unlike the files of "@latest".
+    "SWAGGER_UI_DIST": "https://cdn.jsdelivr.net/npm/swagger-ui-dist@5.9.0",
+    "SWAGGER_UI_FAVICON_HREF": (
+        "https://cdn.jsdelivr.net/npm/swagger-ui-dist@5.9.0/favicon-32x32.png"
+    ),
+}
+
+# Directory of the cache of generated OpenAPI schemas shared by the server processes, see
+# book_giveaway/schema.py. Without it every process generates the schema on its first request.
+SCHEMA_CACHE_DIR = env.str("SCHEMA_CACHE_DIR", default=None)
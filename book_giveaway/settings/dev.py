@@ -0,0 +1,45 @@
+"""
+Settings for local development: debug mode and the debug toolbar.
+"""
+
+import socket
+from django.utils.functional import cached_property
+from .base import *  # noqa: F401, F403
+from .base import INSTALLED_APPS, MIDDLEWARE, env
+
+
+class DockerHostIPs:
+    """
+    IP addresses of the Docker host as seen from the container (the gateways of its networks),
+    the requests from the browser on the host come from them.
+
+    The addresses are resolved the first time they are needed instead of when settings are
+    imported, so commands that never render the toolbar do not pay for the DNS lookup.
+    """
+
+    @cached_property
+    def ips(self):
+        try:
+            _, _, ips = socket.gethostbyname_ex(socket.gethostname())
+        except OSError:
+            ips = []
+        return {"127.0.0.1", *(ip[:-1] + "1" for ip in ips)}
+
+    def __contains__(self, ip):
+        return ip in self.ips
+
+    def __iter__(self):
+        return iter(self.ips)
+
+
+DEBUG = env.bool("DEBUG", default=True)
+
+INTERNAL_IPS = DockerHostIPs()
+
+INSTALLED_APPS = INSTALLED_APPS + ["debug_toolbar"]
+
+MIDDLEWARE = MIDDLEWARE + ["debug_toolbar.middleware.DebugToolbarMiddleware"]
+
+DEBUG_TOOLBAR_CONFIG = {
+    "SHOW_TOOLBAR_CALLBACK": "book_giveaway.middleware.show_debug_toolbar",
+}
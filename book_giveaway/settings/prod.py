@@ -0,0 +1,32 @@
+"""
+Settings for serving the project: no debug tooling and performance oriented defaults.
+"""
+
+from .base import *  # noqa: F401, F403
+from .base import ALLOWED_HOSTS, DATABASE_REPLICAS, DATABASES, TEMPLATES, env
+
+DEBUG = env.bool("DEBUG", default=False)
+
+ALLOWED_HOSTS = env.list("ALLOWED_HOSTS", default=ALLOWED_HOSTS)
+
+# Keep database connections open between requests instead of connecting for every request.
+# Not under ASGI (see book_giveaway/server.py), where every request runs its synchronous code in
+# a new thread, so every request would leave an open connection behind. The read replicas are
+# connected to by every safe request, so they keep their connections open too.
+DATABASES["default"]["CONN_MAX_AGE"] = env.int(
+    "CONN_MAX_AGE", default=0 if env.bool("SERVER_ASGI", default=False) else 60
+)
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias]["CONN_MAX_AGE"] = DATABASES["default"]["CONN_MAX_AGE"]
+
+# Templates (admin, browsable API, Swagger UI) are compiled once per process.
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
@@ -0,0 +1,25 @@
+"""
+Settings for running the tests.
+"""
+
+from .base import *  # noqa: F401, F403
+from .base import BASE_DIR, DATABASES, MIDDLEWARE, env
+
+DEBUG = False
+
+# Maximum numbers of queries of API endpoints, requests executing more queries fail the tests.
+# Set QUERY_BUDGETS_RECORD to true to regenerate the file from the queries of the tests.
+QUERY_BUDGETS_FILE = BASE_DIR / "book_giveaway" / "tests" / "query_budgets.json"
+QUERY_BUDGETS_RECORD = env.bool("QUERY_BUDGETS_RECORD", default=False)
+
+MIDDLEWARE = ["book_giveaway.middleware.QueryBudgetMiddleware"] + MIDDLEWARE
+
+# Hashing passwords with a slow algorithm only slows the tests down.
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Second connection to the test database, used as a read replica by the tests of the database
+# routing (they enable the router themselves).
+DATABASES = {
+    **DATABASES,
+    "replica": {**DATABASES["default"], "TEST": {"MIRROR": "default"}},
+}
@@ -0,0 +1,92 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from . import fastjson
+
+TRUTHY_VALUES = ("1", "true", "yes")
+
+
+def is_asgi_request(request):
+    """
+    Returns True for requests served by the ASGI handler.
+
+    Django 4.0 sends streamed responses of these requests by iterating them in the event loop,
+    where the database can not be queried, so responses whose content is read from the database
+    can not be streamed to them.
+    """
+    return isinstance(getattr(request, "_request", request), ASGIRequest)
+
+
+def iterate_in_chunks(queryset, chunk_size):
+    """
+    Iterates over the queryset with a server-side cursor and yields lists of at most `chunk_size` objects.
+
+    `QuerySet.iterator()` ignores `prefetch_related()` lookups, so they are applied to every chunk
+    separately, which keeps the number of queries proportional to the number of chunks.
+    """
+    lookups = queryset._prefetch_related_lookups
+    chunk = []
+
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) == chunk_size:
+            prefetch_related_objects(chunk, *lookups)
+            yield chunk
+            chunk = []
+
+    if chunk:
+        prefetch_related_objects(chunk, *lookups)
+        yield chunk
+
+
+class StreamingListMixin:
+    """
+    Mixin for list views which adds a streaming mode to the `list` action.
+
+    When the client passes `?stream=true`, the queryset is iterated with a server-side cursor in chunks
+    of `STREAMING_CHUNK_SIZE` objects and the JSON array is sent to the client chunk by chunk with
+    `StreamingHttpResponse`, so memory used by the request is bounded by the chunk size instead of
+    the size of the result. The JSON document is exactly the same as the one returned without streaming.
+
+    Requests served by the ASGI handler get the list without streaming (see `is_asgi_request()`).
+
+    The view has to be a `GenericAPIView`, whose `get_serializer()` serializes every chunk. Its
+    `alist()` works only when a later base class, like `AsyncReadMixin`, has an `alist()`, which
+    serves the requests that are not streamed.
+    """
+
+    stream_query_param = "stream"
+
+    def list(self, request, *args, **kwargs):
+        if not self.should_stream(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_json(queryset), content_type="application/json"
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        # Streamed responses iterate the queryset while they are sent, so they are always built
+        # by the synchronous `list()`.
+        if not self.should_stream(request):
+            return await super().alist(request, *args, **kwargs)
+        return await sync_to_async(self.list)(request, *args, **kwargs)
+
+    def should_stream(self, request):
+        value = request.query_params.get(self.stream_query_param, "")
+        return value.lower() in TRUTHY_VALUES and not is_asgi_request(request)
+
+    def stream_json(self, queryset):
+        separator = b"["
+
+        for chunk in iterate_in_chunks(queryset, settings.STREAMING_CHUNK_SIZE):
+            serializer = self.get_serializer(chunk, many=True)
+            yield separator + b",".join(
+                fastjson.dumps(item) for item in serializer.data
+            )
+            separator = b","
+
+        yield b"[]" if separator == b"[" else b"]"
@@ -0,0 +1,184 @@
+import base64
+import io
+from django.contrib.auth import get_user_model
+from django.http import FileResponse
+from django.test import override_settings
+from django.urls import path, reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APITransactionTestCase
+from books.models import Book, Genre
+from book_giveaway.urls import urlpatterns as project_urlpatterns
+
+PNG_CONTENT = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\xff"
+
+
+def png_view(request):
+    return FileResponse(io.BytesIO(PNG_CONTENT), content_type="image/png")
+
+
+# URLconf of the project with an API view which returns binary content.
+urlpatterns = [path("api/cover.png", png_view), *project_urlpatterns]
+
+
+class BatchViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="test_user@email.com", password="test_pass"
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        Genre.objects.create(genre_name="Fiction")
+
+        cls.batch_url = reverse("batch")
+
+    def batch(self, requests, **data):
+        return self.client.post(
+            self.batch_url, {"requests": requests, **data}, format="json"
+        )
+
+    def test_batch_returns_responses_in_order(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        response = self.batch(
+            [
+                {"path": reverse("user_details_api_view")},
+                {"path": reverse("genres-list")},
+                {"path": "/api/missing/"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        responses = response.json()["responses"]
+        self.assertEqual([item["status"] for item in responses], [200, 200, 404])
+        self.assertEqual(responses[0]["body"]["email"], self.user.email)
+        self.assertEqual(responses[1]["body"][0]["genre_name"], "Fiction")
+        self.assertEqual(responses[1]["headers"]["Content-Type"], "application/json")
+
+    def test_token_is_checked_once(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        requests = [{"path": reverse("user_details_api_view")}] * 3
+
+        # The token lookup of the batch request and nothing else.
+        with self.assertNumQueries(1):
+            response = self.batch(requests)
+
+        self.assertEqual(
+            [item["status"] for item in response.json()["responses"]], [200] * 3
+        )
+
+    def test_sub_requests_check_permissions(self):
+        response = self.batch(
+            [
+                {"path": reverse("user_details_api_view")},
+                {"path": reverse("genres-list")},
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.json()["responses"]], [401, 200]
+        )
+
+    def test_write_then_read(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        response = self.batch(
+            [
+                {
+                    "method": "POST",
+                    "path": reverse("books-list"),
+                    "body": {
+                        "title": "Test Book",
+                        "author": ["Stephen King"],
+                        "genre": ["Fiction"],
+                        "ISBN": "1234567890",
+                        "description": "This is a test book.",
+                        "condition": "Brand New",
+                        "retrieval_location": "Test Location",
+                    },
+                },
+                {"path": f"{reverse('books-list')}?fields=title"},
+            ]
+        )
+
+        created, listed = response.json()["responses"]
+        self.assertEqual(created["status"], status.HTTP_201_CREATED)
+        self.assertEqual(listed["body"], [{"title": "Test Book"}])
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_invalid_batches(self):
+        response = self.batch([])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.batch([{"path": self.batch_url}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(),
+            {"requests": [{"path": ["Batch requests can not be nested."]}]},
+        )
+
+        for other_path in ("/admin/", "/metrics", "/media/book_covers/sha256/a/b.png"):
+            response = self.batch([{"path": other_path}])
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(
+                response.json(),
+                {"requests": [{"path": ["Only requests to the API can be batched."]}]},
+            )
+
+        with self.settings(BATCH_MAX_REQUESTS=2):
+            response = self.batch([{"path": reverse("genres-list")}] * 3)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(), {"requests": ["At most 2 requests can be batched."]}
+        )
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_binary_responses_are_encoded_with_base64(self):
+        response = self.batch([{"path": "/api/cover.png"}])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = response.json()["responses"][0]
+        self.assertEqual(item["status"], 200)
+        self.assertEqual(item["body_encoding"], "base64")
+        self.assertEqual(base64.b64decode(item["body"]), PNG_CONTENT)
+
+
+class ConcurrentBatchTests(APITransactionTestCase):
+    """
+    Concurrent requests run in other threads, with their own database connections, which see only
+    committed data.
+    """
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="test_user@email.com", password="test_pass"
+        )
+        self.token = Token.objects.create(user=user)
+        Genre.objects.create(genre_name="Fiction")
+
+    @override_settings(BATCH_MAX_WORKERS=2)
+    def test_concurrent_reads(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        response = self.client.post(
+            reverse("batch"),
+            {
+                "requests": [
+                    {"path": reverse("user_details_api_view")},
+                    {"path": reverse("genres-list")},
+                    {"path": reverse("books-list")},
+                    {"method": "DELETE", "path": reverse("books-detail", args=["x"])},
+                    {"path": reverse("authors-list")},
+                ],
+                "concurrent": True,
+            },
+            format="json",
+        )
+
+        responses = response.json()["responses"]
+        self.assertEqual(
+            [item["status"] for item in responses], [200, 200, 200, 404, 200]
+        )
+        self.assertEqual(responses[0]["body"]["email"], "test_user@email.com")
+        self.assertEqual(responses[1]["body"][0]["genre_name"], "Fiction")
@@ -0,0 +1,147 @@
+import gzip
+import json
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from books.models import Author, Genre
+from books.tests.factories import create_books
+from book_giveaway import compression
+
+
+class ChooseEncodingTests(SimpleTestCase):
+    def test_quality_values(self):
+        with mock.patch.dict(compression.CODECS, {"br": None, "zstd": None}):
+            self.assertEqual(compression.choose_encoding("gzip, br"), "br")
+            self.assertEqual(compression.choose_encoding("gzip, br;q=0.5"), "gzip")
+            self.assertEqual(compression.choose_encoding("br;q=0, *"), "zstd")
+            self.assertIsNone(compression.choose_encoding("identity"))
+            self.assertIsNone(compression.choose_encoding(""))
+            self.assertEqual(compression.choose_encoding("br, gzip", ["gzip"]), "gzip")
+
+    def test_unavailable_encodings_are_not_chosen(self):
+        with mock.patch.dict(compression.CODECS, clear=True):
+            compression.CODECS["gzip"] = compression.Gzip()
+
+            self.assertEqual(
+                compression.choose_encoding("zstd, br, gzip;q=0.1"), "gzip"
+            )
+
+
+class CompressionMiddlewareTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(
+            email="test_user@email.com", password="test_pass"
+        )
+        cls.token = Token.objects.create(user=user)
+        cls.books = create_books(
+            user,
+            20,
+            authors=[Author.objects.create(author_name="Stephen King")],
+            genres=[Genre.objects.create(genre_name="Fiction")],
+        )
+        cls.book_list_url = reverse("books-list")
+
+    def test_gzip(self):
+        response = self.client.get(self.book_list_url)
+        gzipped_response = self.client.get(
+            self.book_list_url, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(gzipped_response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", gzipped_response["Vary"])
+        self.assertEqual(
+            int(gzipped_response["Content-Length"]), len(gzipped_response.content)
+        )
+        self.assertLess(len(gzipped_response.content), len(response.content))
+        self.assertEqual(gzip.decompress(gzipped_response.content), response.content)
+        # I am checking that the compressed representation has the weak form of the ETag.
+        self.assertEqual(gzipped_response["ETag"], "W/" + response["ETag"])
+        not_modified_response = self.client.get(
+            self.book_list_url,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=gzipped_response["ETag"],
+        )
+        self.assertEqual(
+            not_modified_response.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+    def test_update_with_weak_etag(self):
+        book_detail_url = reverse("books-detail", args=[self.books[0].id])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        with self.settings(COMPRESSION_MIN_SIZE=0):
+            etag = self.client.get(book_detail_url, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+
+        response = self.client.patch(
+            book_detail_url,
+            {"description": "New description"},
+            format="json",
+            HTTP_IF_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # I am checking that the old version is still refused.
+        response = self.client.patch(
+            book_detail_url,
+            {"description": "Other description"},
+            format="json",
+            HTTP_IF_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_streamed_response(self):
+        response = self.client.get(self.book_list_url)
+        gzipped_response = self.client.get(
+            self.book_list_url, {"stream": "true"}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertEqual(gzipped_response["Content-Encoding"], "gzip")
+        self.assertNotIn("Content-Length", gzipped_response)
+        content = gzip.decompress(b"".join(gzipped_response.streaming_content))
+        self.assertEqual(json.loads(content), response.json())
+
+    def test_small_responses_are_not_compressed(self):
+        with self.settings(COMPRESSION_MIN_SIZE=100_000):
+            response = self.client.get(self.book_list_url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_other_pages_are_not_compressed(self):
+        response = self.client.get(reverse("admin:login"), HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_brotli(self):
+        response = self.client.get(self.book_list_url)
+        compressed_response = self.client.get(
+            self.book_list_url, HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+
+        self.assertEqual(compressed_response["Content-Encoding"], "br")
+        self.assertEqual(
+            compression.brotli.decompress(compressed_response.content),
+            response.content,
+        )
+
+    def test_zstd(self):
+        response = self.client.get(self.book_list_url)
+        compressed_response = self.client.get(
+            self.book_list_url, {"stream": "true"}, HTTP_ACCEPT_ENCODING="zstd"
+        )
+
+        self.assertEqual(compressed_response["Content-Encoding"], "zstd")
+        content = (
+            compression.zstandard.ZstdDecompressor()
+            .decompressobj()
+            .decompress(b"".join(compressed_response.streaming_content))
+        )
+        self.assertEqual(json.loads(content), response.json())
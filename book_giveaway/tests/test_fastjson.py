@@ -0,0 +1,68 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from book_giveaway import fastjson
+from book_giveaway.parsers import FastJSONParser
+from book_giveaway.renderers import FastJSONRenderer
+
+DATA = [
+    {
+        "id": uuid.UUID("0b8e2f4c-5d0a-4a8e-9f4e-2d5c1a7b3e6f"),
+        "title": "Vefkhistkaosani\u2028ვეფხისტყაოსანი",
+        "author": ["Shota Rustaveli"],
+        "price": Decimal("1.50"),
+        "condition": gettext_lazy("Used"),
+        "available": True,
+        "book_cover": None,
+        "pages": 316,
+        "created": datetime.datetime(
+            2023, 9, 1, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc
+        ),
+        "updated": datetime.datetime(
+            2023, 9, 2, 16, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=4))
+        ),
+        "published": datetime.date(1712, 1, 1),
+    }
+]
+
+
+class FastJSONTests(SimpleTestCase):
+    def assertSameJSON(self):
+        self.assertEqual(
+            FastJSONRenderer().render(DATA, "application/json"),
+            JSONRenderer().render(DATA, "application/json"),
+        )
+
+    @override_settings(JSON_BACKEND="orjson")
+    def test_orjson_renders_like_json_renderer(self):
+        self.assertTrue(fastjson.use_orjson())
+        self.assertSameJSON()
+
+    @override_settings(JSON_BACKEND="json")
+    def test_standard_library_backend(self):
+        self.assertFalse(fastjson.use_orjson())
+        self.assertSameJSON()
+
+    def test_indented_json(self):
+        self.assertEqual(
+            FastJSONRenderer().render(DATA, "application/json; indent=4"),
+            JSONRenderer().render(DATA, "application/json; indent=4"),
+        )
+
+    def test_parse(self):
+        content = JSONRenderer().render(DATA)
+
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(content)),
+            JSONParser().parse(io.BytesIO(content)),
+        )
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"title": '))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"price": NaN}'))
@@ -0,0 +1,149 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from book_giveaway import metrics
+from book_giveaway.metrics import Registry
+
+
+class RegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.registry = Registry()
+        self.counter = self.registry.counter(
+            "requests_total", "Total number of requests.", ["view"]
+        )
+        self.histogram = self.registry.histogram(
+            "duration_seconds", "Duration.", ["view"], buckets=(0.1, 1)
+        )
+
+    def test_text_format(self):
+        self.counter.inc(view="books-list")
+        self.counter.inc(2, view="books-list")
+        self.histogram.observe(0.05, view="books-list")
+        self.histogram.observe(0.5, view="books-list")
+        self.histogram.observe(5, view="books-list")
+
+        with self.settings(METRICS_MULTIPROCESS_DIR=""):
+            output = self.registry.render()
+
+        self.assertIn("# TYPE requests_total counter", output)
+        self.assertIn('requests_total{view="books-list"} 3', output)
+        self.assertIn("# TYPE duration_seconds histogram", output)
+        self.assertIn('duration_seconds_bucket{view="books-list",le="0.1"} 1', output)
+        self.assertIn('duration_seconds_bucket{view="books-list",le="1"} 2', output)
+        self.assertIn('duration_seconds_bucket{view="books-list",le="+Inf"} 3', output)
+        self.assertIn('duration_seconds_sum{view="books-list"} 5.55', output)
+        self.assertIn('duration_seconds_count{view="books-list"} 3', output)
+
+    def test_values_are_summed_over_processes(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        # File written by another worker process.
+        with open(os.path.join(directory, "metrics-1-other.json"), "w") as file:
+            json.dump(
+                {
+                    "requests_total": [[["books-list"], 4]],
+                    "duration_seconds": [[["books-list"], [1, 0, 0, 0.05, 1]]],
+                },
+                file,
+            )
+
+        self.counter.inc(view="books-list")
+        self.histogram.observe(0.5, view="books-list")
+
+        with self.settings(METRICS_MULTIPROCESS_DIR=directory):
+            output = self.registry.render()
+
+        self.assertIn('requests_total{view="books-list"} 5', output)
+        self.assertIn('duration_seconds_bucket{view="books-list",le="1"} 2', output)
+        self.assertIn('duration_seconds_count{view="books-list"} 2', output)
+
+    def test_throttled_values_are_written_later(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        registry = Registry(flush_interval=0.05)
+        counter = registry.counter("requests_total", "Total number of requests.")
+
+        with self.settings(METRICS_MULTIPROCESS_DIR=directory):
+            counter.inc()
+            registry.flush()
+            # I am checking that the last value is written even without another flush.
+            counter.inc()
+            registry.flush()
+            time.sleep(0.2)
+
+        [file_name] = os.listdir(directory)
+        with open(os.path.join(directory, file_name)) as file:
+            self.assertEqual(json.load(file), {"requests_total": [[[], 2]]})
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_MULTIPROCESS_DIR="")
+class MetricsMiddlewareTests(APITestCase):
+    def get_request_count(self, view, method, status_code):
+        return metrics.http_requests_total.values.get(
+            (view, method, str(status_code)), 0
+        )
+
+    def test_requests_are_counted(self):
+        signup_count = self.get_request_count("signup_api_view", "POST", 201)
+        login_count = self.get_request_count("login_api_view", "POST", 200)
+
+        credentials = {"email": "test_user@email.com", "password": "test_pass"}
+        self.client.post(reverse("signup_api_view"), credentials, format="json")
+        self.client.post(reverse("login_api_view"), credentials, format="json")
+
+        self.assertEqual(
+            self.get_request_count("signup_api_view", "POST", 201), signup_count + 1
+        )
+        self.assertEqual(
+            self.get_request_count("login_api_view", "POST", 200), login_count + 1
+        )
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("books-list"))
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        content = response.content.decode()
+        self.assertIn(
+            'http_requests_total{view="books-list",method="GET",status="200"}', content
+        )
+        self.assertIn(
+            'db_queries_per_request_bucket{view="books-list",method="GET",le="1"}',
+            content,
+        )
+
+    def test_metrics_endpoint_when_disabled(self):
+        with self.settings(METRICS_ENABLED=False):
+            response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(METRICS_ALLOWED_IPS=["10.0.0.0/8"], METRICS_TOKEN="")
+    def test_metrics_endpoint_allowed_ips(self):
+        response = self.client.get(reverse("metrics"), REMOTE_ADDR="10.1.2.3")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # I am checking that clients from other addresses are refused.
+        response = self.client.get(reverse("metrics"), REMOTE_ADDR="192.0.2.1")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_ALLOWED_IPS=[], METRICS_TOKEN="scrape-token")
+    def test_metrics_endpoint_token(self):
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-token"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for authorization in ("", "Bearer wrong-token", "Token scrape-token"):
+            response = self.client.get(
+                reverse("metrics"), HTTP_AUTHORIZATION=authorization
+            )
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
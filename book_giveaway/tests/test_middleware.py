@@ -0,0 +1,211 @@
+import asyncio
+import json
+import os
+import tempfile
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import re_path, reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from books.models import Genre
+from books.views import GenreListAPIView
+from book_giveaway.middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    QueryBudgetMiddleware,
+    ReplicaRoutingMiddleware,
+    RequestMetricsMiddleware,
+    show_debug_toolbar,
+)
+from book_giveaway.querybudget import DuplicateQueriesWarning, QueryBudgetExceeded
+
+
+def duplicate_queries_view(request):
+    # Reads the genres twice with the same query.
+    list(Genre.objects.all())
+    list(Genre.objects.all())
+    return HttpResponse()
+
+
+urlpatterns = [
+    re_path(r"^duplicate-queries/$", duplicate_queries_view, name="duplicate-queries"),
+    re_path(
+        r"^async/genres/$",
+        GenreListAPIView.as_async_view({"get": "list"}),
+        name="async-genres-list",
+    ),
+]
+
+
+@override_settings(
+    REQUEST_METRICS_ENABLED=True,
+    METRICS_ENABLED=True,
+    DATABASE_REPLICAS=["replica"],
+)
+class AsyncMiddlewareTests(APITestCase):
+    def test_middleware_is_async_in_async_chains(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        def get_sync_response(request):
+            return HttpResponse()
+
+        for middleware_class in [
+            RequestMetricsMiddleware,
+            MetricsMiddleware,
+            QueryBudgetMiddleware,
+            ReplicaRoutingMiddleware,
+            CompressionMiddleware,
+        ]:
+            with self.subTest(middleware_class.__name__):
+                self.assertTrue(middleware_class.async_capable)
+                self.assertTrue(
+                    asyncio.iscoroutinefunction(middleware_class(get_response))
+                )
+                self.assertFalse(
+                    asyncio.iscoroutinefunction(middleware_class(get_sync_response))
+                )
+
+
+@override_settings(
+    REQUEST_METRICS_ENABLED=True,
+    REQUEST_METRICS_SLOW_REQUEST_MS=10000,
+    REQUEST_METRICS_SLOW_QUERY_COUNT=10,
+)
+class RequestMetricsMiddlewareTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for num in range(1, 4):
+            Genre.objects.create(genre_name=f"Genre {num}")
+        cls.genre_list_url = reverse("genres-list")
+
+    def get_timings(self, response):
+        return {
+            entry.split(";")[0]: entry
+            for entry in response["Server-Timing"].split(", ")
+        }
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.genre_list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timings = self.get_timings(response)
+        self.assertEqual(set(timings), {"db", "serializer", "view", "total"})
+        self.assertIn('desc="1 queries"', timings["db"])
+
+    @override_settings(ROOT_URLCONF=__name__)
+    async def test_queries_of_async_views_are_counted(self):
+        # The queries are executed in a thread, the middleware runs in the event loop.
+        response = await self.async_client.get("/async/genres/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('desc="1 queries"', self.get_timings(response)["db"])
+
+    def test_slow_requests_are_logged(self):
+        with self.assertNoLogs("book_giveaway.middleware"):
+            self.client.get(self.genre_list_url)
+
+        with self.settings(REQUEST_METRICS_SLOW_REQUEST_MS=0):
+            with self.assertLogs("book_giveaway.middleware", "WARNING") as logs:
+                self.client.get(self.genre_list_url)
+
+        record = logs.records[0].request_metrics
+        self.assertEqual(record["path"], self.genre_list_url)
+        self.assertEqual(record["status"], status.HTTP_200_OK)
+        self.assertEqual(record["query_count"], 1)
+        self.assertIn("serializer_ms", record)
+
+    def test_middleware_is_not_used_when_disabled(self):
+        with self.settings(REQUEST_METRICS_ENABLED=False):
+            response = self.client_class().get(self.genre_list_url)
+
+        self.assertNotIn("Server-Timing", response)
+
+
+@override_settings(QUERY_BUDGETS_RECORD=False)
+class QueryBudgetMiddlewareTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Genre.objects.create(genre_name="Fiction")
+        cls.genre_list_url = reverse("genres-list")
+
+    def write_budgets(self, budgets):
+        file, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(file, "w") as file:
+            json.dump(budgets, file)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_request_within_budget(self):
+        path = self.write_budgets({"genres-list GET": 1})
+
+        with self.settings(QUERY_BUDGETS_FILE=path):
+            response = self.client.get(self.genre_list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_request_over_budget(self):
+        path = self.write_budgets({"genres-list GET": 0})
+
+        with self.settings(QUERY_BUDGETS_FILE=path):
+            with self.assertRaisesMessage(
+                QueryBudgetExceeded,
+                "genres-list GET executed 1 queries, its budget is 0",
+            ):
+                self.client.get(self.genre_list_url)
+
+    def test_endpoint_without_budget(self):
+        path = self.write_budgets({})
+
+        with self.settings(QUERY_BUDGETS_FILE=path):
+            with self.assertRaisesMessage(QueryBudgetExceeded, "has no query budget"):
+                self.client.get(self.genre_list_url)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_duplicate_queries_warning(self):
+        path = self.write_budgets({"duplicate-queries GET": 2})
+
+        with self.settings(QUERY_BUDGETS_FILE=path):
+            with self.assertWarnsMessage(
+                DuplicateQueriesWarning, "duplicate-queries GET"
+            ):
+                self.client.get("/duplicate-queries/")
+
+
+class TokenAPIMiddlewareTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            email="test_user@email.com", password="test_pass"
+        )
+
+    def test_api_requests_do_not_use_sessions_or_csrf(self):
+        response = self.client.post(
+            reverse("login_api_view"),
+            {"email": "test_user@email.com", "password": "test_pass"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("key", response.data)
+        # I am checking that the login did not start a session.
+        self.assertEqual(response.cookies, {})
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+
+    def test_admin_uses_sessions_and_csrf(self):
+        response = self.client.get(reverse("admin:login"))
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("admin:index"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(DEBUG=True, INTERNAL_IPS=["127.0.0.1"])
+    def test_debug_toolbar_is_not_shown_for_api(self):
+        factory = RequestFactory(REMOTE_ADDR="127.0.0.1")
+
+        self.assertFalse(show_debug_toolbar(factory.get(reverse("genres-list"))))
+        self.assertTrue(show_debug_toolbar(factory.get(reverse("admin:index"))))
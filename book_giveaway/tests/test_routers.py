@@ -0,0 +1,161 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITransactionTestCase
+from books.models import Genre
+from book_giveaway import routers
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica"],
+    DATABASE_ROUTERS=["book_giveaway.routers.ReplicaRouter"],
+)
+class ReplicaRoutingTests(APITransactionTestCase):
+    """
+    The "replica" database of the test settings is another connection to the test database, so
+    the tests use transactions which are committed, to make the data visible to both.
+    """
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="test_user@email.com", password="test_pass"
+        )
+        self.token = Token.objects.create(user=user)
+        Genre.objects.create(genre_name="Fiction")
+        self.addCleanup(cache.clear)
+        self.addCleanup(routers._unavailable_until.clear)
+
+    def request(self, method, url, data=None, authenticated=False):
+        """
+        Returns the response and the numbers of queries executed on the primary and the replica.
+        """
+        if authenticated:
+            self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        with CaptureQueriesContext(connections["default"]) as primary:
+            with CaptureQueriesContext(connections["replica"]) as replica:
+                response = getattr(self.client, method)(url, data, format="json")
+        return response, len(primary), len(replica)
+
+    def create_book(self):
+        return self.request(
+            "post",
+            reverse("books-list"),
+            {
+                "title": "Test Book",
+                "author": ["Stephen King"],
+                "genre": ["Fiction"],
+                "ISBN": "1234567890",
+                "description": "This is a test book.",
+                "condition": "Brand New",
+                "retrieval_location": "Test Location",
+            },
+            authenticated=True,
+        )
+
+    def test_safe_requests_read_from_replica(self):
+        response, primary_count, replica_count = self.request(
+            "get", reverse("genres-list")
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(primary_count, 0)
+        self.assertEqual(replica_count, 1)
+
+    def test_tokens_are_read_from_primary(self):
+        response, primary_count, replica_count = self.request(
+            "get", reverse("books-list"), authenticated=True
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Only the token lookup.
+        self.assertEqual(primary_count, 1)
+        self.assertGreater(replica_count, 0)
+
+    def test_writes_use_primary_and_pin_the_client(self):
+        response, primary_count, replica_count = self.create_book()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(primary_count, 0)
+        self.assertEqual(replica_count, 0)
+
+        # I am checking that the client reads its own writes from the primary.
+        response, primary_count, replica_count = self.request(
+            "get", reverse("books-list"), authenticated=True
+        )
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(replica_count, 0)
+
+        # Other clients still read from the replica.
+        self.client.credentials()
+        response, primary_count, replica_count = self.request(
+            "get", reverse("books-list")
+        )
+        self.assertEqual(primary_count, 0)
+        self.assertGreater(replica_count, 0)
+
+    def test_failed_writes_do_not_pin_the_client(self):
+        response, primary_count, replica_count = self.request(
+            "post", reverse("books-list"), {}, authenticated=True
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response, primary_count, replica_count = self.request(
+            "get", reverse("books-list"), authenticated=True
+        )
+        self.assertGreater(replica_count, 0)
+
+    def test_replica_is_chosen_once_per_request(self):
+        with mock.patch.object(
+            routers, "choose_replica", wraps=routers.choose_replica
+        ) as choose_replica:
+            response, primary_count, replica_count = self.request(
+                "get", reverse("books-list"), authenticated=True
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(replica_count, 1)
+        choose_replica.assert_called_once_with()
+
+    async def test_async_requests_read_from_replica(self):
+        # The middleware chain is async, the replica is chosen in a thread.
+        with mock.patch.object(
+            routers, "choose_replica", wraps=routers.choose_replica
+        ) as choose_replica:
+            response = await self.async_client.get(reverse("genres-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
+        choose_replica.assert_called_once_with()
+
+    @override_settings(DATABASE_REPLICAS=["missing"])
+    def test_missing_replica_falls_back_to_primary(self):
+        response, primary_count, replica_count = self.request(
+            "get", reverse("genres-list")
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(primary_count, 1)
+
+    def test_unavailable_replica_falls_back_to_primary(self):
+        connections["replica"].close()
+        with mock.patch.object(
+            connections["replica"], "connect", side_effect=OperationalError
+        ) as connect:
+            with self.assertLogs("book_giveaway.routers", "WARNING"):
+                with CaptureQueriesContext(connections["default"]) as primary:
+                    response = self.client.get(reverse("genres-list"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(primary), 1)
+
+            # I am checking that the replica is not retried right away.
+            self.client.get(reverse("genres-list"))
+            self.assertEqual(connect.call_count, 1)
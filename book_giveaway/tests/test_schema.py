@@ -0,0 +1,91 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+from rest_framework.test import APITestCase
+from book_giveaway import schema
+
+
+class CachedSchemaViewTests(APITestCase):
+    def setUp(self):
+        schema.clear_cache()
+        self.addCleanup(schema.clear_cache)
+        self.schema_url = reverse("Schema")
+
+    def count_generations(self):
+        return mock.patch.object(
+            SchemaGenerator,
+            "get_schema",
+            autospec=True,
+            side_effect=SchemaGenerator.get_schema,
+        )
+
+    def test_schema_is_generated_once(self):
+        with self.count_generations() as get_schema:
+            first = self.client.get(self.schema_url)
+            second = self.client.get(self.schema_url)
+            json_response = self.client.get(self.schema_url, {"format": "json"})
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, second.content)
+        self.assertIn(b"/api/books/", first.content)
+        self.assertIn("/api/books/", json.loads(json_response.content)["paths"])
+        self.assertEqual(get_schema.call_count, 1)
+
+    def test_etag(self):
+        response = self.client.get(self.schema_url)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.client.get(self.schema_url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_gzip(self):
+        response = self.client.get(self.schema_url)
+        gzipped_response = self.client.get(
+            self.schema_url, HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+
+        self.assertEqual(gzipped_response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", gzipped_response["Vary"])
+        self.assertNotEqual(gzipped_response["ETag"], response["ETag"])
+        self.assertEqual(gzip.decompress(gzipped_response.content), response.content)
+
+    def test_gzip_refused_by_client(self):
+        response = self.client.get(self.schema_url)
+        refused_response = self.client.get(
+            self.schema_url, HTTP_ACCEPT_ENCODING="gzip;q=0, deflate"
+        )
+
+        self.assertNotIn("Content-Encoding", refused_response)
+        self.assertEqual(refused_response["ETag"], response["ETag"])
+        self.assertEqual(refused_response.content, response.content)
+
+    def test_file_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(SCHEMA_CACHE_DIR=directory):
+                output = StringIO()
+                call_command("generate_schema", stdout=output)
+                self.assertIn(schema.code_version(), output.getvalue())
+
+                # I am checking that the server uses the generated file.
+                with self.count_generations() as get_schema:
+                    response = self.client.get(self.schema_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b"/api/books/", response.content)
+        self.assertEqual(get_schema.call_count, 0)
+
+    def test_swagger_ui(self):
+        response = self.client.get(reverse("swagger-ui"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("max-age=3600", response["Cache-Control"])
+        self.assertContains(response, "swagger-ui-dist@5.9.0/swagger-ui-bundle.js")
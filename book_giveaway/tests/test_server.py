@@ -0,0 +1,46 @@
+from unittest import mock
+from django.test import SimpleTestCase
+from environs import Env
+from book_giveaway import metrics
+from book_giveaway.server import get_options
+
+
+class ServerOptionsTests(SimpleTestCase):
+    def get_options(self, **environment):
+        with mock.patch.dict("os.environ", environment):
+            return get_options(Env())
+
+    def test_default_options(self):
+        with mock.patch("multiprocessing.cpu_count", return_value=4):
+            options = self.get_options()
+
+        self.assertEqual(options["workers"], 9)
+        self.assertEqual(options["threads"], 4)
+        self.assertEqual(options["worker_class"], "gthread")
+        self.assertTrue(options["preload_app"])
+
+    def test_options_from_environment(self):
+        options = self.get_options(
+            SERVER_WORKERS="3",
+            SERVER_THREADS="1",
+            SERVER_PRELOAD="false",
+            SERVER_KEEPALIVE="75",
+        )
+
+        self.assertEqual(options["workers"], 3)
+        self.assertEqual(options["worker_class"], "sync")
+        self.assertFalse(options["preload_app"])
+        self.assertEqual(options["keepalive"], 75)
+
+    def test_asgi_uses_uvicorn_workers(self):
+        options = self.get_options(SERVER_ASGI="true")
+
+        self.assertEqual(options["worker_class"], "uvicorn.workers.UvicornWorker")
+
+    def test_workers_write_metrics_on_exit(self):
+        options = self.get_options()
+
+        with mock.patch.object(metrics.REGISTRY, "flush") as flush:
+            options["worker_exit"](server=None, worker=None)
+
+        flush.assert_called_once_with(force=True)
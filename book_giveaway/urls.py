@@ -13,26 +13,42 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+
 from django.contrib import admin
 from django.conf import settings
-from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from django.urls import path, re_path, include
+from books.storage import BookCoverStorage
+from books.views import serve_book_cover
+from .views import BatchView, CachedSchemaView, CachedSwaggerView, metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/books/", include("books.urls")),
     path("api/accounts/", include("accounts.urls")),
     path("api/bookings/", include("bookingrequests.urls")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="Schema"),
+    path("api/batch/", BatchView.as_view(), name="batch"),
+    path("api/schema/", CachedSchemaView.as_view(), name="Schema"),
     path(
         "api/schema/swagger-ui/",
-        SpectacularSwaggerView.as_view(url_name="Schema"),
+        CachedSwaggerView.as_view(url_name="Schema"),
         name="swagger-ui",
     ),
+    path("metrics", metrics, name="metrics"),
 ]
 
 
 if settings.DEBUG:
+    # In production the web server or CDN serves MEDIA_ROOT (see `serve_book_cover`).
+    urlpatterns.append(
+        re_path(
+            rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>{BookCoverStorage.digest_directory}/.+)$",
+            serve_book_cover,
+            name="book-cover",
+        )
+    )
+
+
+if "debug_toolbar" in settings.INSTALLED_APPS:
     import debug_toolbar
 
     urlpatterns = [
@@ -0,0 +1,143 @@
+import hmac
+import ipaddress
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.urls import reverse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from rest_framework.generics import GenericAPIView
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from .batch import BatchResponseSerializer, BatchSerializer, run_batch
+from .compression import choose_encoding
+from .metrics import REGISTRY
+from .schema import render_schema
+
+
+def is_metrics_client(request):
+    """
+    Returns whether the client may read the metrics: its address is in `METRICS_ALLOWED_IPS` or it
+    sent the `METRICS_TOKEN` as a bearer token.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if (
+        settings.METRICS_TOKEN
+        and scheme.lower() == "bearer"
+        and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+    ):
+        return True
+
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_IPS
+    )
+
+
+def metrics(request):
+    """
+    Exposes metrics of the project in Prometheus text format to the clients allowed to read them.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if not is_metrics_client(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    OpenAPI schema of the API, generated and rendered once (see `book_giveaway.schema`) and
+    served compressed with gzip when the client accepts it. Clients revalidate it with its
+    ETag, so unchanged schemas are not downloaded again.
+    """
+
+    def _get_schema_response(self, request):
+        version = (
+            self.api_version or request.version or self._get_version_parameter(request)
+        )
+        lang = request.GET.get("lang") if settings.USE_I18N else None
+        renderer = request.accepted_renderer
+
+        def generate():
+            generator = self.generator_class(
+                urlconf=self.urlconf, api_version=version, patterns=self.patterns
+            )
+            return generator.get_schema(request=request, public=self.serve_public)
+
+        rendered = render_schema(renderer, generate, version, lang)
+        gzipped = (
+            choose_encoding(request.headers.get("Accept-Encoding", ""), ["gzip"])
+            == "gzip"
+        )
+        etag = rendered.gzipped_etag if gzipped else rendered.etag
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                rendered.gzipped_content if gzipped else rendered.content,
+                content_type=f"{renderer.media_type}; charset={renderer.charset}",
+            )
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, version)}"'
+            )
+            if gzipped:
+                response["Content-Encoding"] = "gzip"
+
+        response["ETag"] = etag
+        patch_vary_headers(response, ["Accept-Encoding"])
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+class CachedSwaggerView(SpectacularSwaggerView):
+    """
+    Swagger UI page, cached by browsers for an hour. The Swagger UI files are loaded from the
+    CDN by their exact version (`SWAGGER_UI_DIST`), which the CDN serves as immutable.
+    """
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        patch_cache_control(response, public=True, max_age=3600)
+        return response
+
+
+class BatchView(GenericAPIView):
+    """
+    Runs several API requests and returns all their responses, so a client can load a screen with
+    one round trip.
+
+    The requests are run in their order, as the user authenticated by the batch request (send its
+    credentials only once). With `concurrent`, consecutive requests with safe methods run at the
+    same time. Every response has its own status, the batch request itself succeeds even when
+    some of the requests fail.
+    """
+
+    serializer_class = BatchSerializer
+    # The batched requests check the permissions of their views.
+    permission_classes = (AllowAny,)
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), "batch_path": reverse("batch")}
+
+    @extend_schema(responses=BatchResponseSerializer)
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        responses = run_batch(
+            request,
+            serializer.validated_data["requests"],
+            serializer.validated_data["concurrent"],
+        )
+        return Response({"responses": responses})
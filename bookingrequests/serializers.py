@@ -1,11 +1,13 @@
 from rest_framework import serializers
+from book_giveaway.instrumentation import TimedSerializerMixin, TimedListSerializer
 from .models import BookingRequest, Notification
 
 
-class BookingRequestSerializer(serializers.ModelSerializer):
+class BookingRequestSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = BookingRequest
         fields = "__all__"
+        list_serializer_class = TimedListSerializer
         read_only_fields = [
             "owner",
             "requester",
@@ -38,7 +40,9 @@ class BookingRequestSerializer(serializers.ModelSerializer):
         return data
 
 
-class RetrieveUpdateDeleteBookingRequestSerializer(serializers.ModelSerializer):
+class RetrieveUpdateDeleteBookingRequestSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
     book_owner_id = serializers.ReadOnlyField(source="book.owner.id")
     book_owner_email = serializers.ReadOnlyField(source="book.owner.email")
     book_title = serializers.ReadOnlyField(source="book.title")
@@ -46,6 +50,7 @@ class RetrieveUpdateDeleteBookingRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = BookingRequest
         fields = "__all__"
+        list_serializer_class = TimedListSerializer
         read_only_fields = [
             "requester",
             "status",
@@ -56,7 +61,8 @@ class ManageBookingRequestSerializer(serializers.Serializer):
     approve = serializers.BooleanField(required=True)
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = "__all__"
+        list_serializer_class = TimedListSerializer
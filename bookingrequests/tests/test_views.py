@@ -6,10 +6,14 @@ from rest_framework import status
 from books.tests.test_views import UserTestsData
 from bookingrequests.models import BookingRequest, Notification
 from books.models import Book, Genre, Author
+from book_giveaway.querybudget import QueryBudgetTestMixin
+from books.tests.factories import create_users
 import json
 
 
-class ListCreateBookingRequestsTestClass(APITestCase, UserTestsData):
+class ListCreateBookingRequestsTestClass(
+    QueryBudgetTestMixin, APITestCase, UserTestsData
+):
     @classmethod
     def setUpTestData(cls):
         UserTestsData.setUpTestData()
@@ -151,6 +155,37 @@ class ListCreateBookingRequestsTestClass(APITestCase, UserTestsData):
 
         self.assertEqual(response_for_list.status_code, status.HTTP_200_OK)
 
+    def test_booking_request_list_queries_do_not_grow(self):
+        def add_booking_requests():
+            BookingRequest.objects.bulk_create(
+                [
+                    BookingRequest(book=self.book, requester=requester)
+                    for requester in create_users(3, prefix="requester")
+                ]
+            )
+
+        # Listing the booking requests of the book owner, there has to be at least one of them.
+        BookingRequest.objects.create(book=self.book, requester=self.requester_user)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        self.assertQueriesDoNotGrow(
+            lambda: self.client.get(self.booking_request_list_create_url),
+            add_booking_requests,
+        )
+
+    def test_notification_list_queries_do_not_grow(self):
+        def add_notifications():
+            for num in range(1, 4):
+                Notification.objects.create(
+                    user=self.requester_user, book=f"Book {num}", approved=False
+                )
+
+        self.assertQueriesDoNotGrow(
+            lambda: self.client.get(reverse("booking-notifications")),
+            add_notifications,
+        )
+
     def test_booking_request_listing_for_unauthenticated_user(self):
         client = self.client_class()
         response_for_list = client.get(self.booking_request_list_create_url)
@@ -492,16 +527,7 @@ class ManageRequestsTestClass(APITestCase, UserTestsData):
         cls.token = Token.objects.create(user=cls.user)
 
         # Creating users that I will use to make booking requests.
-        User = get_user_model()
-        cls.user1 = User.objects.create_user(
-            email="requester_1@email.com", password="requester_1_test_pass"
-        )
-        cls.user2 = User.objects.create_user(
-            email="requester_2@email.com", password="requester_2_test_pass"
-        )
-        cls.user3 = User.objects.create_user(
-            email="requester_3@email.com", password="requester_3_test_pass"
-        )
+        cls.user1, cls.user2, cls.user3 = create_users(3, prefix="requester_")
 
         # Creating genre, author and book.
         cls.genre = Genre.objects.create(genre_name="Fiction")
@@ -745,3 +771,20 @@ class ManageRequestsTestClass(APITestCase, UserTestsData):
         response = self.client.delete(another_url, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_notification_streaming(self):
+        self.client.put(self.url, data={"approve": True}, format="json")
+
+        token = Token.objects.create(user=self.user1)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        url = reverse("booking-notifications")
+        response = self.client.get(url, format="json")
+        streamed_response = self.client.get(url, {"stream": "true"})
+
+        self.assertEqual(streamed_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            json.loads(b"".join(streamed_response.streaming_content)),
+            response.json(),
+        )
@@ -19,6 +19,7 @@ from .permissions import (
     IsBookOwner,
 )
 from .utils import process_booking_request
+from book_giveaway.streaming import StreamingListMixin
 from .models import BookingRequest
 from .models import Notification
 
@@ -229,7 +230,7 @@ class ManageBookingRequestView(UpdateAPIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class NotificationListView(ListAPIView):
+class NotificationListView(StreamingListMixin, ListAPIView):
     """
     **API Endpoint for Listing User Notifications.**
 
@@ -248,6 +249,10 @@ class NotificationListView(ListAPIView):
 
     - `list (GET)`: Retrieves a list of notifications for the authenticated user.
 
+    **Streaming:**
+
+    - `stream`: Pass **'true'** to stream the list of notifications in chunks instead of building the whole response in memory.
+
     **Responses:**
 
     - Successful retrieval will return status code **200 (OK)**.
@@ -0,0 +1,74 @@
+from book_giveaway.streaming import iterate_in_chunks
+from .serializers import format_datetime
+from .storage import book_cover_storage
+
+BOOK_EXPORT_FIELDS = [
+    "id",
+    "title",
+    "ISBN",
+    "author",
+    "genre",
+    "owner",
+    "owner_email",
+    "description",
+    "condition",
+    "book_cover",
+    "available",
+    "retrieval_location",
+    "created",
+    "updated",
+]
+
+
+def export_book_rows(queryset, chunk_size, request=None):
+    """
+    Yields chunks of plain dictionaries (with keys from `BOOK_EXPORT_FIELDS`) for the books in the queryset.
+
+    Rows are fetched with `values()` through a server-side cursor instead of creating model instances,
+    so memory usage stays flat no matter how many books are exported. URLs of book covers are absolute
+    when the request is given, like in the responses of `BookSerializer`.
+    """
+
+    def cover_url(name):
+        if not name:
+            return None
+        url = book_cover_storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    rows = queryset.prefetch_related(None).values(
+        "id",
+        "title",
+        "ISBN",
+        "owner",
+        "owner__email",
+        "description",
+        "condition",
+        "book_cover",
+        "available",
+        "retrieval_location",
+        "created",
+        "updated",
+        "author_names",
+        "genre_names",
+    )
+
+    for chunk in iterate_in_chunks(rows, chunk_size):
+        yield [
+            {
+                "id": str(row["id"]),
+                "title": row["title"],
+                "ISBN": row["ISBN"],
+                "author": row["author_names"],
+                "genre": row["genre_names"],
+                "owner": str(row["owner"]),
+                "owner_email": row["owner__email"],
+                "description": row["description"],
+                "condition": row["condition"],
+                "book_cover": cover_url(row["book_cover"]),
+                "available": row["available"],
+                "retrieval_location": row["retrieval_location"],
+                "created": format_datetime(row["created"]),
+                "updated": format_datetime(row["updated"]),
+            }
+            for row in chunk
+        ]
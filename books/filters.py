@@ -3,11 +3,29 @@ from .models import Book
 
 
 class BookFilter(django_filters.FilterSet):
+    # Authors and genres are filtered by the denormalized name arrays (which have GIN indexes)
+    # instead of joining many-to-many tables, query parameters stay the same.
+    author__author_name = django_filters.CharFilter(
+        field_name="author_names", method="filter_names"
+    )
+    genre__genre_name = django_filters.CharFilter(
+        field_name="genre_names", method="filter_names"
+    )
+
     class Meta:
         model = Book
         fields = {
-            "author__author_name",
-            "genre__genre_name",
             "condition",
             "available",
         }
+
+    def filter_names(self, queryset, name, value):
+        return queryset.filter(**{f"{name}__contains": [value]})
+
+
+class BookExportFilter(django_filters.FilterSet):
+    class Meta:
+        model = Book
+        fields = {
+            "updated": ["gt"],
+        }
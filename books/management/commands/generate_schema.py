@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from drf_spectacular.settings import spectacular_settings
+from book_giveaway.schema import write_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema of the API into SCHEMA_CACHE_DIR, so that the server "
+        "does not generate it on the first request"
+    )
+
+    def handle(self, *args, **kwargs):
+        if not settings.SCHEMA_CACHE_DIR:
+            raise CommandError("SCHEMA_CACHE_DIR setting is not set.")
+
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+        path = write_schema(lambda: generator.get_schema(request=None, public=True))
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully generated {path}."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from books.models import Book
+
+
+class Command(BaseCommand):
+    help = "Rebuild denormalized author and genre names of books"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of books processed at once",
+        )
+
+    def handle(self, *args, **kwargs):
+        updated_count = Book.objects.all().rebuild_name_arrays(
+            chunk_size=kwargs["chunk_size"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rebuilt names of {updated_count} books.")
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 4.0.10 on 2026-10-19 19:07
+
+import books.models
+import books.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0006_remove_author_author_info_remove_author_country_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="book",
+            name="book_cover",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=books.storage.BookCoverStorage(),
+                upload_to=books.models.Book.book_cover_filename,
+            ),
+        ),
+    ]
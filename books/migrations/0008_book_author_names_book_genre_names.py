@@ -0,0 +1,81 @@
+# Generated by Django 4.0.10 on 2026-10-19 19:13
+
+from collections import defaultdict
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+def fill_name_arrays(apps, schema_editor):
+    """
+    Stores the names in the order in which the authors and genres were added to the books (the
+    order of the rows of the through tables).
+    """
+    Book = apps.get_model("books", "Book")
+
+    for field_name, array_field, name_field in (
+        ("author", "author_names", "author_name"),
+        ("genre", "genre_names", "genre_name"),
+    ):
+        through = Book._meta.get_field(field_name).remote_field.through
+        names = defaultdict(list)
+        for book_id, name in (
+            through.objects.order_by("id")
+            .values_list("book_id", f"{field_name}__{name_field}")
+            .iterator()
+        ):
+            names[book_id].append(name)
+
+        Book.objects.bulk_update(
+            [
+                Book(id=book_id, **{array_field: book_names})
+                for book_id, book_names in names.items()
+            ],
+            [array_field],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0007_book_cover_storage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="author_names",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=100),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="genre_names",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=100),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["author_names"], name="book_author_names_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["genre_names"], name="book_genre_names_gin"
+            ),
+        ),
+        migrations.RunPython(fill_name_arrays, migrations.RunPython.noop),
+    ]
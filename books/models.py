@@ -1,6 +1,12 @@
 import uuid
+from collections import defaultdict
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, router, transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+from .storage import book_cover_storage
 
 
 class Genre(models.Model):
@@ -31,6 +37,68 @@ class Author(models.Model):
         return self.author_name
 
 
+# Many-to-many field of the Book -> (denormalized array field, name field of the related model).
+NAME_ARRAYS = {
+    "author": ("author_names", "author_name"),
+    "genre": ("genre_names", "genre_name"),
+}
+
+
+def get_related_names(descriptor, book_ids):
+    """
+    Returns a dictionary which maps ids of the given books to the names of their authors or
+    genres (depending on the many-to-many descriptor: `Book.author` or `Book.genre`), in the order
+    in which they were added to the books.
+    """
+    field_name = descriptor.field.name
+    name_lookup = f"{field_name}__{NAME_ARRAYS[field_name][1]}"
+    names = defaultdict(list)
+
+    for book_id, name in (
+        descriptor.through.objects.filter(book_id__in=book_ids)
+        .order_by("id")
+        .values_list("book_id", name_lookup)
+    ):
+        names[book_id].append(name)
+
+    return names
+
+
+class BookQuerySet(models.QuerySet):
+    def rebuild_name_arrays(self, chunk_size=1000):
+        """
+        Recomputes `author_names` and `genre_names` of the books in the queryset from their
+        many-to-many relations and saves the ones that changed. Returns the number of updated books.
+        """
+        updated_count = 0
+        book_ids = list(self.order_by().values_list("id", flat=True))
+
+        for start in range(0, len(book_ids), chunk_size):
+            chunk_ids = book_ids[start : start + chunk_size]
+            authors = get_related_names(Book.author, chunk_ids)
+            genres = get_related_names(Book.genre, chunk_ids)
+            now = timezone.now()
+
+            changed_books = [
+                Book(
+                    id=book_id,
+                    author_names=authors[book_id],
+                    genre_names=genres[book_id],
+                    updated=now,
+                )
+                for book_id, author_names, genre_names in Book.objects.filter(
+                    id__in=chunk_ids
+                ).values_list("id", "author_names", "genre_names")
+                if author_names != authors[book_id] or genre_names != genres[book_id]
+            ]
+            Book.objects.bulk_update(
+                changed_books, ["author_names", "genre_names", "updated"]
+            )
+            updated_count += len(changed_books)
+
+        return updated_count
+
+
 class Book(models.Model):
     """
     Model for a book with various details.
@@ -48,11 +116,20 @@ class Book(models.Model):
         retrieval_location (str): The location from where the book can be retrieved.
         created (DateTimeField): The date and time when the book record was created.
         updated (DateTimeField): The date and time when the book record was last updated.
+        author_names (ArrayField): Names of the authors, denormalized from the `author` field.
+        genre_names (ArrayField): Names of the genres, denormalized from the `genre` field.
+
+    `author_names` and `genre_names` are kept in sync with the many-to-many fields by the signal
+    handlers in books/signals.py, so books can be read and filtered by authors and genres without
+    joining `books_book_author` and `books_book_genre` tables. The names are in the order in which
+    the authors and genres were added to the book (the order of the rows of those tables).
     """
 
     def book_cover_filename(self, filename):
         """
         Used for assigning names to book covers so that they are more manageable and unique.
+        When `BOOK_COVER_DEDUPLICATION` is enabled, `BookCoverStorage` replaces this name with
+        the digest of the cover's content.
         """
         return f"book_covers/{self.id}-{filename}"
 
@@ -71,11 +148,129 @@ class Book(models.Model):
     condition = models.CharField(
         max_length=10, choices=CONDITION_CHOICES, default="Brand New"
     )
-    book_cover = models.ImageField(upload_to=book_cover_filename, blank=True, null=True)
+    book_cover = models.ImageField(
+        upload_to=book_cover_filename,
+        storage=book_cover_storage,
+        blank=True,
+        null=True,
+    )
     available = models.BooleanField(default=True)
     retrieval_location = models.CharField(max_length=255)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    author_names = ArrayField(
+        models.CharField(max_length=100), default=list, blank=True, editable=False
+    )
+    genre_names = ArrayField(
+        models.CharField(max_length=100), default=list, blank=True, editable=False
+    )
+
+    objects = BookQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["author_names"], name="book_author_names_gin"),
+            GinIndex(fields=["genre_names"], name="book_genre_names_gin"),
+        ]
 
     def __str__(self):
         return self.title
+
+    def save_if_unchanged(self, update_fields):
+        """
+        Writes the given fields and a new `updated` time with a single conditional UPDATE, which
+        only matches the row when its `updated` time is still the one read into this instance, so
+        changes made by others since then are never overwritten. Returns whether the book was saved.
+
+        Uploaded book covers are stored only once the UPDATE matched, and `post_save` is sent
+        with `update_fields`, so django_cleanup deletes a replaced cover after the commit.
+        """
+        read_version = self.updated
+        file_fields = []
+        values = {}
+        for name in [*update_fields, "updated"]:
+            field = self._meta.get_field(name)
+            if isinstance(field, models.FileField):
+                file_fields.append(field)
+            else:
+                # Sets the new `updated` time.
+                values[field.attname] = field.pre_save(self, add=False)
+
+        using = router.db_for_write(Book, instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            books = Book.objects.using(using).filter(pk=self.pk)
+            if not books.filter(updated=read_version).update(**values):
+                self.updated = read_version
+                return False
+
+            if file_fields:
+                # The row stays locked by the UPDATE until the files are stored.
+                books.update(
+                    **{
+                        field.attname: field.pre_save(self, add=False)
+                        for field in file_fields
+                    }
+                )
+            post_save.send(
+                sender=Book,
+                instance=self,
+                created=False,
+                update_fields=frozenset(update_fields),
+                raw=False,
+                using=using,
+            )
+        return True
+
+    def set_related(self, field_name, objects):
+        """
+        Makes the given objects the authors or genres (depending on `field_name`: "author" or
+        "genre") of the book. Rows of the through table of the objects the book keeps are left as
+        they are and rows of the new ones are added in the given order, so the relation keeps the
+        order in which the objects were added. The denormalized names are set on the instance in
+        that order, but not saved.
+
+        Sends no m2m_changed signals, the caller saves the names.
+        """
+        through = getattr(Book, field_name).through
+        target_field = f"{field_name}_id"
+        current_ids = list(
+            through.objects.filter(book_id=self.pk)
+            .order_by("id")
+            .values_list(target_field, flat=True)
+        )
+        objects_by_id = {obj.pk: obj for obj in objects}
+
+        removed_ids = [pk for pk in current_ids if pk not in objects_by_id]
+        if removed_ids:
+            through.objects.filter(
+                book_id=self.pk, **{f"{target_field}__in": removed_ids}
+            ).delete()
+        added_ids = [pk for pk in objects_by_id if pk not in current_ids]
+        through.objects.bulk_create(
+            [through(book_id=self.pk, **{target_field: pk}) for pk in added_ids]
+        )
+
+        array_field, name_field = NAME_ARRAYS[field_name]
+        kept_ids = [pk for pk in current_ids if pk in objects_by_id]
+        setattr(
+            self,
+            array_field,
+            [getattr(objects_by_id[pk], name_field) for pk in kept_ids + added_ids],
+        )
+
+    def sync_name_array(self, field_name):
+        """
+        Recomputes the denormalized names for the given many-to-many field ("author" or "genre")
+        and saves them, unless they are already up to date.
+        """
+        array_field = NAME_ARRAYS[field_name][0]
+        names = get_related_names(getattr(Book, field_name), [self.pk])[self.pk]
+
+        if getattr(self, array_field) == names:
+            return
+
+        self.updated = timezone.now()
+        setattr(self, array_field, names)
+        Book.objects.filter(pk=self.pk).update(
+            **{array_field: names, "updated": self.updated}
+        )
@@ -1,26 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Genre, Book, Author
+from rest_framework.relations import MANY_RELATION_KWARGS
+from book_giveaway.asyncviews import async_list
+from book_giveaway.conditional import PreconditionFailed
+from book_giveaway.instrumentation import TimedSerializerMixin, TimedListSerializer
+from .models import NAME_ARRAYS, Genre, Book, Author
+from .storage import book_cover_storage
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = "__all__"
+        list_serializer_class = TimedListSerializer
 
 
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Author
         fields = "__all__"
+        list_serializer_class = TimedListSerializer
 
 
-class BookSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
+def get_or_create_by_names(model, name_field, names):
+    """
+    Returns the authors or genres (depending on the model) with the given names, in the same order
+    and without duplicates, creating the missing ones. Reads them with one query and inserts the
+    missing ones with another, instead of a `get_or_create()` per name.
+    """
+    names = list(dict.fromkeys(names))
+    objects = {
+        getattr(obj, name_field): obj
+        for obj in model.objects.filter(**{f"{name_field}__in": names})
+    }
+    missing_names = [name for name in names if name not in objects]
+    if missing_names:
+        try:
+            with transaction.atomic():
+                created = model.objects.bulk_create(
+                    [model(**{name_field: name}) for name in missing_names]
+                )
+        except IntegrityError:
+            # Some of the names were created by a concurrent request in the meantime.
+            created = model.objects.filter(**{f"{name_field}__in": missing_names})
+        objects.update((getattr(obj, name_field), obj) for obj in created)
+    return [objects[name] for name in names]
+
+
+class NameArrayField(serializers.ManyRelatedField):
+    """
+    Many-to-many field of `BookSerializer` represented by the denormalized names of the book, in
+    the order in which the authors or genres were added, without querying the relation.
+    """
+
+    def get_attribute(self, instance):
+        return getattr(instance, NAME_ARRAYS[self.field_name][0])
+
+    def to_representation(self, iterable):
+        return list(iterable)
+
+
+class NameRelatedField(serializers.SlugRelatedField):
+    """
+    `SlugRelatedField` which also accepts instances of the related model, which
+    `BookSerializer.to_internal_value()` already looked up, without reading them again.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return NameArrayField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, self.get_queryset().model):
+            return data
+        return super().to_internal_value(data)
+
+
+class BookSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    genre = NameRelatedField(
         slug_field="genre_name",
         queryset=Genre.objects.all(),
         many=True,
     )
-    author = serializers.SlugRelatedField(
+    author = NameRelatedField(
         slug_field="author_name",
         queryset=Author.objects.all(),
         many=True,
@@ -30,20 +99,311 @@ class BookSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Book
-        fields = "__all__"
+        exclude = ["author_names", "genre_names"]
         read_only_fields = ["owner", "owner_email"]
+        list_serializer_class = TimedListSerializer
 
     def to_internal_value(self, data):
+        if hasattr(data, "getlist"):
+            # Multipart data, which uploads book covers, has a list of values for every field.
+            data = {
+                name: data.getlist(name) if name in NAME_ARRAYS else data[name]
+                for name in data
+            }
+
         genre_names = data.get("genre", [])
-        data["genre"] = [
-            Genre.objects.get_or_create(genre_name=genre.capitalize())[0]
-            for genre in genre_names
-        ]
+        data["genre"] = get_or_create_by_names(
+            Genre, "genre_name", [genre.capitalize() for genre in genre_names]
+        )
 
         author_names = data.get("author", [])
-        data["author"] = [
-            Author.objects.get_or_create(author_name=author.title())[0]
-            for author in author_names
-        ]
+        data["author"] = get_or_create_by_names(
+            Author, "author_name", [author.title() for author in author_names]
+        )
 
         return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        validated_data = self.with_name_arrays(validated_data)
+        relations = {
+            name: validated_data.pop(name)
+            for name in NAME_ARRAYS
+            if name in validated_data
+        }
+        with transaction.atomic():
+            instance = super().create(validated_data)
+            for name, objects in relations.items():
+                instance.set_related(name, objects)
+        return instance
+
+    def update(self, instance, validated_data):
+        """
+        Writes only the changed fields, with an optimistic concurrency check: the book is saved only
+        if nobody changed it since it was read, otherwise the update fails with "412 Precondition
+        Failed" and the client has to read the book again. The book and its relations are written
+        in one transaction.
+        """
+        relations = {
+            name: validated_data.pop(name)
+            for name in NAME_ARRAYS
+            if name in validated_data
+        }
+        changed_fields = [
+            name
+            for name, value in validated_data.items()
+            if getattr(instance, name) != value
+        ]
+        for name in changed_fields:
+            setattr(instance, name, validated_data[name])
+
+        with transaction.atomic():
+            # Changed relations change the name arrays, which are saved with the book below. When
+            # the book was changed by somebody else, the relations are rolled back with it.
+            for name, objects in relations.items():
+                array_field = NAME_ARRAYS[name][0]
+                names = getattr(instance, array_field)
+                instance.set_related(name, objects)
+                if getattr(instance, array_field) != names:
+                    changed_fields.append(array_field)
+
+            if changed_fields and not instance.save_if_unchanged(changed_fields):
+                raise PreconditionFailed
+        return instance
+
+    def with_name_arrays(self, validated_data):
+        """
+        Adds denormalized author and genre names of a new book to the validated data, in the order
+        in which `Book.set_related()` adds the authors and genres, so that they are written
+        together with the rest of the book.
+        """
+        for name, (array_field, name_field) in NAME_ARRAYS.items():
+            if name in validated_data:
+                validated_data[array_field] = [
+                    getattr(obj, name_field) for obj in validated_data[name]
+                ]
+        return validated_data
+
+
+def format_datetime(value):
+    """
+    Formats datetimes the same way as `serializers.DateTimeField` does (ISO 8601 in the current
+    time zone, with "Z" instead of "+00:00").
+    """
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+class BookReadListSerializer(TimedListSerializer):
+    """
+    When a queryset is serialized, books are read with `values()` instead of creating model
+    instances, and emails of the owners are read with one additional query for the whole list.
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, QuerySet):
+            return self.child.queryset_to_representation(data)
+        return super().to_representation(data)
+
+
+class BookReadSerializer(TimedSerializerMixin, serializers.BaseSerializer):
+    """
+    Read-only serializer for books, used by `BookViewSet` for safe methods.
+
+    It returns exactly the same representation as `BookSerializer`, but builds dictionaries
+    directly instead of going through the field machinery of `ModelSerializer`, which dominates the
+    CPU time of book list requests.
+
+    When the context has a list of `fields` (sparse fieldset requested by the client), only those
+    fields are returned and only the columns they are built from are read.
+    """
+
+    value_fields = [
+        "id",
+        "title",
+        "ISBN",
+        "description",
+        "condition",
+        "book_cover",
+        "available",
+        "retrieval_location",
+        "created",
+        "updated",
+        "owner",
+        "author_names",
+        "genre_names",
+    ]
+
+    # Fields of the representation (in its order): the column they are built from.
+    field_columns = {
+        "id": "id",
+        "genre": "genre_names",
+        "author": "author_names",
+        "owner_email": "owner",
+        "title": "title",
+        "ISBN": "ISBN",
+        "description": "description",
+        "condition": "condition",
+        "book_cover": "book_cover",
+        "available": "available",
+        "retrieval_location": "retrieval_location",
+        "created": "created",
+        "updated": "updated",
+        "owner": "owner",
+    }
+
+    class Meta:
+        list_serializer_class = BookReadListSerializer
+
+    @classmethod
+    def parse_fields(cls, value):
+        """
+        Parses a comma separated list of fields (the `fields` query parameter) and returns the
+        fields in the order of the representation.
+        """
+        requested = {name.strip() for name in value.split(",") if name.strip()}
+        if not requested:
+            raise serializers.ValidationError(
+                {"fields": ["At least one field has to be selected."]}
+            )
+        unknown = requested - cls.field_columns.keys()
+        if unknown:
+            raise serializers.ValidationError(
+                {"fields": [f"Unknown fields: {', '.join(sorted(unknown))}."]}
+            )
+        return [name for name in cls.field_columns if name in requested]
+
+    @classmethod
+    def columns_for(cls, fields):
+        return list(dict.fromkeys(cls.field_columns[name] for name in fields))
+
+    @property
+    def sparse_fields(self):
+        """
+        Fields requested by the client (`fields` in the context), None means all of them.
+        """
+        return self.context.get("fields")
+
+    def needs_owner_emails(self):
+        return self.sparse_fields is None or "owner_email" in self.sparse_fields
+
+    def to_representation(self, instance):
+        if self.sparse_fields is not None:
+            row = {
+                column: getattr(instance, "owner_id" if column == "owner" else column)
+                for column in self.columns_for(self.sparse_fields)
+            }
+            if "book_cover" in row:
+                row["book_cover"] = row["book_cover"].name
+            owner_email = instance.owner.email if self.needs_owner_emails() else None
+            return self.build_sparse_representation(row, owner_email)
+
+        return self.build_representation(
+            {
+                "id": instance.id,
+                "title": instance.title,
+                "ISBN": instance.ISBN,
+                "description": instance.description,
+                "condition": instance.condition,
+                "book_cover": instance.book_cover.name,
+                "available": instance.available,
+                "retrieval_location": instance.retrieval_location,
+                "created": instance.created,
+                "updated": instance.updated,
+                "owner": instance.owner_id,
+                "author_names": instance.author_names,
+                "genre_names": instance.genre_names,
+            },
+            owner_email=instance.owner.email,
+        )
+
+    def queryset_to_representation(self, queryset):
+        rows = list(self.get_rows(queryset))
+        owner_emails = {}
+        if self.needs_owner_emails():
+            owner_emails = dict(self.get_owner_emails(rows))
+        return self.rows_to_representation(rows, owner_emails)
+
+    async def aqueryset_to_representation(self, queryset):
+        rows = await async_list(self.get_rows(queryset))
+        owner_emails = {}
+        if self.needs_owner_emails():
+            owner_emails = dict(await async_list(self.get_owner_emails(rows)))
+        return self.rows_to_representation(rows, owner_emails)
+
+    def get_rows(self, queryset):
+        return (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .values(
+                *(
+                    self.value_fields
+                    if self.sparse_fields is None
+                    else self.columns_for(self.sparse_fields)
+                )
+            )
+        )
+
+    def get_owner_emails(self, rows):
+        return (
+            get_user_model()
+            .objects.filter(id__in={row["owner"] for row in rows})
+            .values_list("id", "email")
+        )
+
+    def rows_to_representation(self, rows, owner_emails):
+        if self.sparse_fields is not None:
+            return [
+                self.build_sparse_representation(
+                    row, owner_emails.get(row.get("owner"))
+                )
+                for row in rows
+            ]
+        return [
+            self.build_representation(row, owner_email=owner_emails[row["owner"]])
+            for row in rows
+        ]
+
+    def cover_url(self, name):
+        if not name:
+            return None
+        url = book_cover_storage.url(name)
+        request = self.context.get("request")
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return url
+
+    def build_representation(self, row, owner_email):
+        return {
+            "id": str(row["id"]),
+            "genre": row["genre_names"],
+            "author": row["author_names"],
+            "owner_email": owner_email,
+            "title": row["title"],
+            "ISBN": row["ISBN"],
+            "description": row["description"],
+            "condition": row["condition"],
+            "book_cover": self.cover_url(row["book_cover"]),
+            "available": row["available"],
+            "retrieval_location": row["retrieval_location"],
+            "created": format_datetime(row["created"]),
+            "updated": format_datetime(row["updated"]),
+            "owner": row["owner"],
+        }
+
+    def build_sparse_representation(self, row, owner_email):
+        representation = {}
+        for name in self.sparse_fields:
+            if name == "owner_email":
+                value = owner_email
+            else:
+                value = row[self.field_columns[name]]
+                if name == "id":
+                    value = str(value)
+                elif name == "book_cover":
+                    value = self.cover_url(value)
+                elif name in ("created", "updated"):
+                    value = format_datetime(value)
+            representation[name] = value
+        return representation
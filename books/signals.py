@@ -0,0 +1,56 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .models import Book, Author, Genre
+
+
+@receiver(m2m_changed, sender=Book.author.through)
+@receiver(m2m_changed, sender=Book.genre.through)
+def sync_book_name_arrays(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keeps `Book.author_names` and `Book.genre_names` in sync when authors or genres of books change,
+    either from the book side (`book.author.set(...)`) or from the other side (`author.book_set.add(...)`).
+    """
+    field_name = "author" if sender is Book.author.through else "genre"
+
+    if action == "pre_clear" and reverse:
+        # Books are not known after the relation is cleared, so they are remembered beforehand.
+        instance._cleared_book_ids = list(
+            Book.objects.filter(**{field_name: instance}).values_list("id", flat=True)
+        )
+        return
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        instance.sync_name_array(field_name)
+        return
+
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_book_ids", [])
+    Book.objects.filter(pk__in=pk_set).rebuild_name_arrays()
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Genre)
+def sync_book_names_on_rename(sender, instance, created, **kwargs):
+    if not created:
+        field_name = "author" if sender is Author else "genre"
+        Book.objects.filter(**{field_name: instance}).rebuild_name_arrays()
+
+
+@receiver(pre_delete, sender=Author)
+@receiver(pre_delete, sender=Genre)
+def remember_books_before_delete(sender, instance, **kwargs):
+    # Many-to-many rows are deleted without m2m_changed signal, so books are remembered beforehand.
+    field_name = "author" if sender is Author else "genre"
+    instance._deleted_book_ids = list(
+        Book.objects.filter(**{field_name: instance}).values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Genre)
+def sync_book_names_on_delete(sender, instance, **kwargs):
+    book_ids = instance.__dict__.pop("_deleted_book_ids", [])
+    Book.objects.filter(pk__in=book_ids).rebuild_name_arrays()
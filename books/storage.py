@@ -0,0 +1,67 @@
+import hashlib
+import os
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+
+class BookCoverStorage(FileSystemStorage):
+    """
+    File storage for book covers.
+
+    When `BOOK_COVER_DEDUPLICATION` setting is enabled, every uploaded cover is stored under the
+    SHA-256 digest of its content (for example: "book_covers/sha256/3f/3fa9...e1.jpg") instead of the
+    name returned by `Book.book_cover_filename`. This way the same cover uploaded for many copies of a
+    popular title is stored only once and, because the content behind such a name never changes,
+    it can be cached forever by browsers and CDNs.
+
+    Content-addressed files are shared between books, so they are reference counted: a file is only
+    removed from the disk (for example by django_cleanup) once no book references it anymore.
+    """
+
+    digest_directory = "book_covers/sha256"
+
+    def save(self, name, content, max_length=None):
+        if not getattr(settings, "BOOK_COVER_DEDUPLICATION", False):
+            return super().save(name, content, max_length=max_length)
+
+        if name is None:
+            name = content.name
+
+        digest = self.content_digest(content)
+        extension = os.path.splitext(name)[1].lower()
+        name = f"{self.digest_directory}/{digest[:2]}/{digest}{extension}"
+
+        # Same name means same content, so there is no need to write the file again.
+        if self.exists(name):
+            return name
+
+        return super().save(name, content, max_length=max_length)
+
+    def delete(self, name):
+        if self.is_content_addressed(name) and self.reference_count(name):
+            return
+        super().delete(name)
+
+    def content_digest(self, content):
+        """
+        Returns hex encoded SHA-256 digest of the uploaded file, reading it in chunks.
+        """
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        return sha256.hexdigest()
+
+    def is_content_addressed(self, name):
+        return bool(name) and name.startswith(f"{self.digest_directory}/")
+
+    def reference_count(self, name):
+        """
+        Returns the number of books that are using the cover stored under the given name.
+        """
+        Book = apps.get_model("books", "Book")
+        return Book.objects.filter(book_cover=name).count()
+
+
+book_cover_storage = BookCoverStorage()
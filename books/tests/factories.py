@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from books.models import Book
+
+
+def create_users(count, prefix="user", password="test_pass"):
+    """
+    Creates `count` users (user1@email.com, user2@email.com, ...) with one query, the password is
+    hashed only once for all of them.
+    """
+    User = get_user_model()
+    password = make_password(password)
+    return User.objects.bulk_create(
+        [
+            User(email=f"{prefix}{num}@email.com", password=password)
+            for num in range(1, count + 1)
+        ]
+    )
+
+
+def create_books(owner, count, authors=(), genres=(), start=1, **fields):
+    """
+    Creates `count` books ("Book 1", "Book 2", ...) of the owner written by all the `authors` and
+    belonging to all the `genres` with three queries. Other fields of the books can be passed as
+    keyword arguments.
+    """
+    return bulk_create_books(
+        [
+            Book(
+                **{
+                    "title": f"Book {num}",
+                    "ISBN": str(num),
+                    "retrieval_location": "Tbilisi",
+                    "owner": owner,
+                    **fields,
+                }
+            )
+            for num in range(start, start + count)
+        ],
+        [authors] * count,
+        [genres] * count,
+    )
+
+
+def bulk_create_books(books, authors, genres):
+    """
+    Saves the unsaved books with `bulk_create()`, `authors[i]` and `genres[i]` become the authors
+    and genres of `books[i]`. Executes three queries.
+
+    Many-to-many rows created with `bulk_create()` do not send m2m_changed signals, so the
+    `author_names` and `genre_names` arrays of the books are filled here, in the same order.
+    """
+    for book, book_authors, book_genres in zip(books, authors, genres):
+        book.author_names = [author.author_name for author in book_authors]
+        book.genre_names = [genre.genre_name for genre in book_genres]
+
+    books = Book.objects.bulk_create(books)
+    Book.author.through.objects.bulk_create(
+        [
+            Book.author.through(book_id=book.id, author_id=author.id)
+            for book, book_authors in zip(books, authors)
+            for author in book_authors
+        ]
+    )
+    Book.genre.through.objects.bulk_create(
+        [
+            Book.genre.through(book_id=book.id, genre_id=genre.id)
+            for book, book_genres in zip(books, genres)
+            for genre in book_genres
+        ]
+    )
+    return books
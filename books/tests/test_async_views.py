@@ -0,0 +1,152 @@
+from operator import itemgetter
+from django.test import override_settings
+from django.urls import include, path
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from rest_framework.authtoken.models import Token
+from books.models import Book, Genre, Author
+from books.views import BookViewSet, GenreListAPIView, AuthorListAPIView
+from .factories import create_books
+from .test_views import UserTestsData
+
+# The same views as the ones used with ASYNC_VIEWS setting, next to the synchronous ones.
+urlpatterns = [
+    path("sync/", include("books.urls")),
+    path(
+        "async/genres/",
+        GenreListAPIView.as_async_view({"get": "list"}),
+        name="async-genres-list",
+    ),
+    path(
+        "async/authors/",
+        AuthorListAPIView.as_async_view({"get": "list"}),
+        name="async-authors-list",
+    ),
+    path(
+        "async/",
+        BookViewSet.as_async_view({"get": "list", "post": "create"}),
+        name="async-books-list",
+    ),
+    path(
+        "async/<pk>/",
+        BookViewSet.as_async_view({"get": "retrieve", "delete": "destroy"}),
+        name="async-books-detail",
+    ),
+]
+
+
+@override_settings(ROOT_URLCONF="books.tests.test_async_views")
+class AsyncViewsTests(APITestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+
+        cls.token = Token.objects.create(user=cls.user)
+        cls.genre = Genre.objects.create(genre_name="Fiction")
+        cls.author = Author.objects.create(author_name="Stephen King")
+
+        cls.book = create_books(cls.user, 2, authors=[cls.author], genres=[cls.genre])[
+            0
+        ]
+        create_books(
+            cls.user,
+            1,
+            authors=[cls.author],
+            genres=[cls.genre],
+            start=3,
+            available=False,
+        )
+
+    def assertSameResponse(self, async_response, sync_response):
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.json(), sync_response.json())
+
+    def test_book_list_matches_sync_view(self):
+        # Books are not ordered, so I am comparing them sorted by their ids.
+        async_books = self.client.get("/async/").json()
+        sync_books = self.client.get("/sync/").json()
+
+        self.assertEqual(len(async_books), 3)
+        self.assertEqual(
+            sorted(async_books, key=itemgetter("id")),
+            sorted(sync_books, key=itemgetter("id")),
+        )
+
+    def test_book_list_with_sparse_fieldset(self):
+        params = {"fields": "id,title,owner_email"}
+        async_books = self.client.get("/async/", params).json()
+        sync_books = self.client.get("/sync/", params).json()
+
+        self.assertEqual(set(async_books[0]), {"id", "title", "owner_email"})
+        self.assertEqual(
+            sorted(async_books, key=itemgetter("id")),
+            sorted(sync_books, key=itemgetter("id")),
+        )
+
+        response = self.client.get(f"/async/{self.book.id}/", {"fields": "title"})
+        self.assertEqual(response.json(), {"title": "Book 1"})
+
+    def test_book_list_with_filters(self):
+        response = self.client.get("/async/", {"available": "false"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([book["title"] for book in response.json()], ["Book 3"])
+
+    def test_book_list_queries(self):
+        # Validators of the list, books and owner emails, no queries for authentication of
+        # anonymous users.
+        with self.assertNumQueries(3):
+            self.client.get("/async/")
+
+    def test_book_retrieve_matches_sync_view(self):
+        self.assertSameResponse(
+            self.client.get(f"/async/{self.book.id}/"),
+            self.client.get(f"/sync/{self.book.id}/"),
+        )
+
+    def test_book_retrieve_not_found(self):
+        response = self.client.get("/async/not-a-uuid/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.book.delete()
+        response = self.client.get(f"/async/{self.book.id}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_conditional_requests(self):
+        for url in ("/async/", f"/async/{self.book.id}/"):
+            sync_response = self.client.get(url.replace("/async/", "/sync/"))
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=sync_response["ETag"])
+
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response["ETag"], sync_response["ETag"])
+
+    def test_genre_and_author_lists_match_sync_views(self):
+        self.assertSameResponse(
+            self.client.get("/async/genres/"), self.client.get("/sync/genres/")
+        )
+        self.assertSameResponse(
+            self.client.get("/async/authors/"), self.client.get("/sync/authors/")
+        )
+
+    def test_other_methods_use_sync_view(self):
+        book_data = {
+            "title": "Test Book",
+            "author": ["Stephen King"],
+            "genre": ["Fiction"],
+            "ISBN": "1234567890",
+            "retrieval_location": "Test Location",
+        }
+
+        # Unauthenticated users can not create books.
+        response = self.client.post("/async/", book_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        response = client.post("/async/", book_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = client.delete(f"/async/{self.book.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Book.objects.count(), 3)
@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APIClient
+from books.export import BOOK_EXPORT_FIELDS
+from books.models import Book, Genre, Author
+from .test_views import UserTestsData
+
+
+@override_settings(STREAMING_CHUNK_SIZE=2)
+class BookExportViewTests(APITestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+        cls.token = Token.objects.create(user=cls.user)
+
+        cls.genre = Genre.objects.create(genre_name="Fiction")
+        cls.author1 = Author.objects.create(author_name="Charles Dickens")
+        cls.author2 = Author.objects.create(author_name="Stephen King")
+
+        # Creating three books so that they are exported in two chunks.
+        cls.books = []
+        for num in range(1, 4):
+            book = Book.objects.create(
+                title=f"Book {num}",
+                ISBN=str(num),
+                retrieval_location="Tbilisi",
+                owner=cls.user,
+            )
+            book.genre.add(cls.genre)
+            book.author.add(cls.author1, cls.author2)
+            cls.books.append(book)
+
+        cls.export_url = reverse("books-export")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.export_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+
+        self.assertEqual([row["title"] for row in rows], ["Book 1", "Book 2", "Book 3"])
+        self.assertEqual(rows[0]["owner_email"], "test_user@email.com")
+        self.assertEqual(rows[0]["genre"], ["Fiction"])
+        self.assertEqual(sorted(rows[0]["author"]), ["Charles Dickens", "Stephen King"])
+
+    def test_export_matches_book_serializer(self):
+        response = self.client.get(self.export_url)
+        row = json.loads(b"".join(response.streaming_content).decode().splitlines()[0])
+
+        detail_response = self.client.get(
+            reverse("books-detail", kwargs={"pk": self.books[0].pk})
+        )
+        self.assertEqual(row, detail_response.json())
+
+    def test_csv_export(self):
+        response = self.client.get(self.export_url, {"format": "csv"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]["title"], "Book 3")
+        self.assertEqual(rows[2]["genre"], "Fiction")
+
+    def test_csv_export_without_books(self):
+        response = self.client.get(
+            self.export_url,
+            {"format": "csv", "updated__gt": self.books[2].updated.isoformat()},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(content.splitlines(), [",".join(BOOK_EXPORT_FIELDS)])
+
+    def test_book_cover_urls_are_absolute(self):
+        Book.objects.filter(pk=self.books[0].pk).update(
+            book_cover="book_covers/cover.png"
+        )
+
+        response = self.client.get(self.export_url)
+        row = json.loads(b"".join(response.streaming_content).decode().splitlines()[0])
+        detail_response = self.client.get(
+            reverse("books-detail", kwargs={"pk": self.books[0].pk})
+        )
+
+        self.assertEqual(
+            row["book_cover"], "http://testserver/media/book_covers/cover.png"
+        )
+        self.assertEqual(row["book_cover"], detail_response.json()["book_cover"])
+
+    def test_incremental_export(self):
+        # Updating the first book so that it is the only one updated after the second book.
+        self.books[0].description = "Updated description"
+        self.books[0].save()
+
+        response = self.client.get(
+            self.export_url, {"updated__gt": self.books[2].updated.isoformat()}
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["description"], "Updated description")
+
+    def test_export_with_unauthenticated_user(self):
+        client = self.client_class()
+        response = client.get(self.export_url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,83 @@
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from books.models import Book, Genre, Author
+from books.serializers import (
+    BookSerializer,
+    BookReadSerializer,
+    get_or_create_by_names,
+)
+from .test_views import UserTestsData
+
+
+class BookReadSerializerTests(TestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+
+        cls.genre = Genre.objects.create(genre_name="Fiction")
+        cls.author1 = Author.objects.create(author_name="Charles Dickens")
+        cls.author2 = Author.objects.create(author_name="Stephen King")
+
+        for num in range(1, 4):
+            book = Book.objects.create(
+                title=f"Book {num}",
+                ISBN=str(num),
+                retrieval_location="Tbilisi",
+                owner=cls.user,
+                # Only the file name is needed for the representation.
+                book_cover=f"book_covers/cover-{num}.png" if num % 2 else None,
+            )
+            book.genre.add(cls.genre)
+            book.author.add(cls.author1, cls.author2)
+
+        # Book without authors and genres.
+        Book.objects.create(
+            title="Book 4", ISBN="4", retrieval_location="Tbilisi", owner=cls.user
+        )
+
+    def setUp(self):
+        self.context = {"request": APIRequestFactory().get("/api/books/")}
+        self.queryset = Book.objects.order_by("title").prefetch_related(
+            "genre", "author"
+        )
+
+    def test_list_representation_matches_book_serializer(self):
+        expected = BookSerializer(self.queryset, many=True, context=self.context).data
+        data = BookReadSerializer(self.queryset, many=True, context=self.context).data
+
+        self.assertEqual(data, expected)
+        # Checking that the order of the keys is the same as well.
+        self.assertEqual(
+            [list(book) for book in data], [list(book) for book in expected]
+        )
+
+    def test_list_representation_uses_constant_number_of_queries(self):
+        # Books (with denormalized author and genre names) and owner emails.
+        with self.assertNumQueries(2):
+            BookReadSerializer(self.queryset, many=True, context=self.context).data
+
+    def test_instance_representation_matches_book_serializer(self):
+        book = self.queryset.first()
+        expected = BookSerializer(book, context=self.context).data
+        data = BookReadSerializer(book, context=self.context).data
+
+        self.assertEqual(data, expected)
+
+
+class GetOrCreateByNamesTests(TestCase):
+    def test_names_are_looked_up_in_bulk(self):
+        fiction = Genre.objects.create(genre_name="Fiction")
+        names = ["History", "Fiction", "Poetry", "History"]
+
+        # The existing genres are read, the missing ones inserted inside a savepoint.
+        with self.assertNumQueries(4):
+            genres = get_or_create_by_names(Genre, "genre_name", names)
+
+        self.assertEqual(
+            [genre.genre_name for genre in genres], ["History", "Fiction", "Poetry"]
+        )
+        self.assertEqual(genres[1], fiction)
+        self.assertTrue(all(genre.pk for genre in genres))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_or_create_by_names(Genre, "genre_name", names), genres)
@@ -0,0 +1,69 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from books.models import Book, Genre, Author
+from .test_views import UserTestsData
+
+
+class BookNameArraysTests(TestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+
+        cls.genre1 = Genre.objects.create(genre_name="History")
+        cls.genre2 = Genre.objects.create(genre_name="Fiction")
+        cls.author1 = Author.objects.create(author_name="Stephen King")
+        cls.author2 = Author.objects.create(author_name="Charles Dickens")
+        cls.book = Book.objects.create(
+            title="Test Book",
+            ISBN="1234567890",
+            retrieval_location="Tbilisi",
+            owner=cls.user,
+        )
+
+    def assertNames(self, author_names, genre_names):
+        # Checking both the instance in memory and the row in the database.
+        book = Book.objects.get(pk=self.book.pk)
+        self.assertEqual(book.author_names, author_names)
+        self.assertEqual(book.genre_names, genre_names)
+
+    def test_names_follow_changes_of_book_relations(self):
+        # Names are in the order in which the authors were added.
+        self.book.author.add(self.author1)
+        self.book.author.add(self.author2)
+        self.book.genre.set([self.genre1])
+        self.assertEqual(self.book.author_names, ["Stephen King", "Charles Dickens"])
+        self.assertNames(["Stephen King", "Charles Dickens"], ["History"])
+
+        self.book.author.remove(self.author1)
+        self.book.genre.clear()
+        self.assertNames(["Charles Dickens"], [])
+
+    def test_names_follow_changes_from_author_and_genre_side(self):
+        self.author1.book_set.add(self.book)
+        self.genre2.book_set.add(self.book)
+        self.assertNames(["Stephen King"], ["Fiction"])
+
+        self.genre2.book_set.clear()
+        self.assertNames(["Stephen King"], [])
+
+    def test_names_follow_renames_and_deletes(self):
+        self.book.author.add(self.author1)
+        self.book.genre.add(self.genre1, self.genre2)
+
+        self.author1.author_name = "Stephen Edwin King"
+        self.author1.save()
+        self.genre1.delete()
+
+        self.assertNames(["Stephen Edwin King"], ["Fiction"])
+
+    def test_rebuild_command(self):
+        self.book.author.add(self.author1)
+        # Breaking denormalized names on purpose, queryset update does not send signals.
+        Book.objects.update(author_names=[], genre_names=["Wrong"])
+
+        output = StringIO()
+        call_command("rebuild_book_names", stdout=output)
+
+        self.assertIn("rebuilt names of 1 books", output.getvalue())
+        self.assertNames(["Stephen King"], [])
@@ -0,0 +1,165 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from books.models import Book
+from books.storage import book_cover_storage
+from books.views import BookViewSet, serve_book_cover
+from .test_views import UserTestsData
+
+
+def create_cover(name="cover.png", color="red"):
+    image_file = io.BytesIO()
+    Image.new("RGB", (10, 10), color=color).save(image_file, format="PNG")
+    return SimpleUploadedFile(name, image_file.getvalue(), content_type="image/png")
+
+
+class BookCoverStorageTests(TestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def create_book(self, number, cover):
+        return Book.objects.create(
+            title=f"Book {number}",
+            ISBN=str(number),
+            retrieval_location="Tbilisi",
+            owner=self.user,
+            book_cover=cover,
+        )
+
+    def test_identical_covers_are_stored_once(self):
+        with self.settings(MEDIA_ROOT=self.media_root, BOOK_COVER_DEDUPLICATION=True):
+            book1 = self.create_book(1, create_cover("first.png"))
+            book2 = self.create_book(2, create_cover("second.png"))
+            book3 = self.create_book(3, create_cover("third.png", color="blue"))
+
+            self.assertEqual(book1.book_cover.name, book2.book_cover.name)
+            self.assertNotEqual(book1.book_cover.name, book3.book_cover.name)
+            self.assertTrue(book1.book_cover.name.startswith("book_covers/sha256/"))
+            self.assertEqual(
+                book_cover_storage.reference_count(book1.book_cover.name), 2
+            )
+
+            stored_files = [
+                files
+                for _, _, files in os.walk(os.path.join(self.media_root, "book_covers"))
+            ]
+            self.assertEqual(sum(len(files) for files in stored_files), 2)
+
+    def test_shared_cover_is_deleted_only_when_unreferenced(self):
+        with self.settings(MEDIA_ROOT=self.media_root, BOOK_COVER_DEDUPLICATION=True):
+            book1 = self.create_book(1, create_cover())
+            book2 = self.create_book(2, create_cover())
+            name = book1.book_cover.name
+
+            book1.delete()
+            book_cover_storage.delete(name)
+            # Second book still uses the same file.
+            self.assertTrue(book_cover_storage.exists(name))
+
+            book2.delete()
+            book_cover_storage.delete(name)
+            self.assertFalse(book_cover_storage.exists(name))
+
+    def test_covers_use_book_names_without_deduplication(self):
+        with self.settings(MEDIA_ROOT=self.media_root, BOOK_COVER_DEDUPLICATION=False):
+            book = self.create_book(1, create_cover())
+
+            self.assertEqual(book.book_cover.name, f"book_covers/{book.id}-cover.png")
+
+    def test_content_addressed_cover_is_served_as_immutable(self):
+        with self.settings(MEDIA_ROOT=self.media_root, BOOK_COVER_DEDUPLICATION=True):
+            book = self.create_book(1, create_cover())
+            response = serve_book_cover(
+                RequestFactory().get(book.book_cover.url), book.book_cover.name
+            )
+
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("immutable", response["Cache-Control"])
+
+            # I am checking that Django does not serve covers without DEBUG.
+            response = self.client.get(book.book_cover.url)
+            self.assertEqual(response.status_code, 404)
+
+
+class BookCoverUpdateTests(APITestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings = self.settings(
+            MEDIA_ROOT=self.media_root, BOOK_COVER_DEDUPLICATION=True
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.book = Book.objects.create(
+            title="Book 1",
+            ISBN="1",
+            retrieval_location="Tbilisi",
+            owner=self.user,
+            book_cover=create_cover(),
+        )
+        self.book_detail_url = reverse("books-detail", args=[self.book.id])
+
+    def test_replaced_cover_is_deleted(self):
+        old_name = self.book.book_cover.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                self.book_detail_url,
+                {"book_cover": create_cover(color="blue")},
+                format="multipart",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        new_name = Book.objects.get(id=self.book.id).book_cover.name
+        self.assertNotEqual(new_name, old_name)
+        self.assertTrue(book_cover_storage.exists(new_name))
+        self.assertFalse(book_cover_storage.exists(old_name))
+
+    def test_cover_is_not_stored_when_update_fails(self):
+        get_object = BookViewSet.get_object
+
+        def get_object_then_update(view):
+            book = get_object(view)
+            # Another client updates the book after this request read it.
+            Book.objects.filter(id=book.id).update(updated=timezone.now())
+            return book
+
+        cover = create_cover(color="blue")
+        digest = book_cover_storage.content_digest(cover)
+        with mock.patch.object(BookViewSet, "get_object", get_object_then_update):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    self.book_detail_url, {"book_cover": cover}, format="multipart"
+                )
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertTrue(book_cover_storage.exists(self.book.book_cover.name))
+        stored_names = [
+            name
+            for _, _, files in os.walk(os.path.join(self.media_root, "book_covers"))
+            for name in files
+        ]
+        self.assertEqual(len(stored_names), 1)
+        self.assertNotIn(digest, stored_names[0])
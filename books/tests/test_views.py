@@ -1,9 +1,24 @@
+import json
+import time
+from operator import itemgetter
+from unittest import mock
+from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from rest_framework.authtoken.models import Token
 from books.models import Book, Genre, Author
+from books.views import BookViewSet
+from book_giveaway.querybudget import QueryBudgetTestMixin
+from .factories import create_books
 
 
 class UserTestsData:
@@ -15,7 +30,7 @@ class UserTestsData:
         )
 
 
-class BookListCreateViewTests(APITestCase, UserTestsData):
+class BookListCreateViewTests(QueryBudgetTestMixin, APITestCase, UserTestsData):
     @classmethod
     def setUpTestData(cls):
         UserTestsData.setUpTestData()
@@ -103,6 +118,23 @@ class BookListCreateViewTests(APITestCase, UserTestsData):
 
         self.assertEqual(list_book_response.status_code, status.HTTP_200_OK)
 
+    def test_book_list_queries_do_not_grow(self):
+        def add_books():
+            # Every book has its own author and genre, so that nothing is shared between them.
+            for num in range(1, 4):
+                create_books(
+                    self.user,
+                    1,
+                    authors=[Author.objects.create(author_name=f"Author {num}")],
+                    genres=[Genre.objects.create(genre_name=f"Genre {num}")],
+                    start=num,
+                )
+
+        self.client.post(self.book_list_url, self.book_data, format="json")
+        self.assertQueriesDoNotGrow(
+            lambda: self.client.get(self.book_list_url), add_books
+        )
+
 
 class BookRetrieveUpdateDeleteViewTests(APITestCase, UserTestsData):
     @classmethod
@@ -400,3 +432,492 @@ class AuthorListViewTests(APITestCase, UserTestsData):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 10)
+
+
+@override_settings(STREAMING_CHUNK_SIZE=2)
+class StreamingListTests(APITestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+
+        cls.genre = Genre.objects.create(genre_name="Fiction")
+        cls.author = Author.objects.create(author_name="Stephen King")
+
+        # Creating five books so that they are streamed in three chunks.
+        create_books(cls.user, 5, authors=[cls.author], genres=[cls.genre])
+
+        cls.book_list_url = reverse("books-list")
+        cls.author_list_url = reverse("authors-list")
+
+    def get_streamed_json(self, response):
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_streamed_book_list_matches_regular_list(self):
+        response = self.client.get(self.book_list_url)
+        streamed_response = self.client.get(self.book_list_url, {"stream": "true"})
+
+        self.assertEqual(streamed_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(streamed_response["Content-Type"], "application/json")
+        # Books are not ordered, so I am comparing them sorted by their ids.
+        self.assertEqual(
+            sorted(self.get_streamed_json(streamed_response), key=itemgetter("id")),
+            sorted(response.json(), key=itemgetter("id")),
+        )
+
+    def test_streamed_book_list_with_filters(self):
+        streamed_response = self.client.get(
+            self.book_list_url, {"stream": "true", "genre__genre_name": "Fiction"}
+        )
+        books = self.get_streamed_json(streamed_response)
+
+        self.assertEqual(len(books), 5)
+        self.assertTrue(all(book["genre"] == ["Fiction"] for book in books))
+
+        streamed_response = self.client.get(
+            self.book_list_url, {"stream": "true", "available": "false"}
+        )
+        self.assertEqual(self.get_streamed_json(streamed_response), [])
+
+    def test_streamed_author_list(self):
+        streamed_response = self.client.get(self.author_list_url, {"stream": "1"})
+
+        self.assertEqual(
+            self.get_streamed_json(streamed_response),
+            [{"id": self.author.id, "author_name": "Stephen King"}],
+        )
+
+
+@override_settings(STREAMING_CHUNK_SIZE=2)
+class ASGIStreamingTests(APITestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+
+        cls.token = Token.objects.create(user=cls.user)
+        create_books(cls.user, 5)
+
+    def asgi_get(self, path, query_string=b""):
+        """
+        Sends a GET request through the ASGI handler the way ASGI servers do, so that streamed
+        responses are iterated in the event loop, and returns the status and the body.
+        """
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query_string,
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Token {self.token.key}".encode()),
+            ],
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request"}
+
+        async def send(message):
+            messages.append(message)
+
+        # Like the test client, the connection of the test transaction must not be closed.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            async_to_sync(ASGIHandler().handle)(scope, receive, send)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        return messages[0]["status"], body
+
+    def test_streamed_book_list(self):
+        response = self.client.get(reverse("books-list"))
+        status_code, body = self.asgi_get(reverse("books-list"), b"stream=true")
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(json.loads(body), key=itemgetter("id")),
+            sorted(response.json(), key=itemgetter("id")),
+        )
+
+    def test_book_export(self):
+        status_code, body = self.asgi_get(reverse("books-export"), b"format=csv")
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        # Header and five books.
+        self.assertEqual(len(body.decode().splitlines()), 6)
+
+
+class SparseFieldsetTests(APITestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+
+        cls.genre = Genre.objects.create(genre_name="Fiction")
+        cls.author = Author.objects.create(author_name="Stephen King")
+        cls.books = create_books(cls.user, 3, authors=[cls.author], genres=[cls.genre])
+
+        cls.book_list_url = reverse("books-list")
+        cls.book_detail_url = reverse("books-detail", args=[cls.books[0].id])
+
+    def get_books(self, params):
+        response = self.client.get(self.book_list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(response.json(), key=itemgetter("id"))
+
+    def test_list_returns_requested_fields(self):
+        full_books = self.get_books({})
+
+        # I am requesting the fields in another order than the one of the representation.
+        # The queries are the validators of the list and the books.
+        with self.assertNumQueries(2):
+            books = self.get_books({"fields": "title,id,available,author"})
+
+        self.assertEqual(
+            books,
+            [
+                {key: book[key] for key in ("id", "author", "title", "available")}
+                for book in full_books
+            ],
+        )
+        self.assertEqual(list(books[0]), ["id", "author", "title", "available"])
+
+    def test_list_with_owner_email(self):
+        # Emails of the owners are read with one more query only when they are requested.
+        with self.assertNumQueries(3):
+            books = self.get_books({"fields": "id,owner_email"})
+
+        self.assertEqual(
+            books,
+            [
+                {"id": str(book.id), "owner_email": "test_user@email.com"}
+                for book in sorted(self.books, key=lambda book: str(book.id))
+            ],
+        )
+
+    def test_streamed_list_returns_requested_fields(self):
+        response = self.client.get(
+            self.book_list_url, {"fields": "id,title,updated", "stream": "true"}
+        )
+        books = json.loads(b"".join(response.streaming_content))
+
+        self.assertEqual(
+            sorted(books, key=itemgetter("id")),
+            [
+                {key: book[key] for key in ("id", "title", "updated")}
+                for book in self.get_books({})
+            ],
+        )
+
+    def test_retrieve_returns_requested_fields(self):
+        full_book = self.client.get(self.book_detail_url).json()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.book_detail_url, {"fields": "id,book_cover,owner_email,genre"}
+            )
+
+        self.assertEqual(
+            response.json(),
+            {
+                key: full_book[key]
+                for key in ("id", "genre", "owner_email", "book_cover")
+            },
+        )
+
+    def test_unknown_fields(self):
+        response = self.client.get(self.book_list_url, {"fields": "id,price,shelf"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"fields": ["Unknown fields: price, shelf."]})
+
+    def test_empty_selection(self):
+        for value in (",", " , "):
+            response = self.client.get(self.book_list_url, {"fields": value})
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(
+                response.json(),
+                {"fields": ["At least one field has to be selected."]},
+            )
+
+
+class BookBatchTests(APITestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+
+        cls.genre = Genre.objects.create(genre_name="Fiction")
+        cls.author = Author.objects.create(author_name="Stephen King")
+        cls.books = create_books(cls.user, 3, authors=[cls.author], genres=[cls.genre])
+
+        cls.batch_url = reverse("books-batch")
+        cls.missing_id = "00000000-0000-4000-8000-000000000000"
+
+    def get_batch(self, ids, **params):
+        return self.client.get(self.batch_url, {"ids": ",".join(ids), **params})
+
+    def test_batch_preserves_requested_order(self):
+        ids = [str(book.id) for book in reversed(self.books)]
+        full_books = [
+            self.client.get(reverse("books-detail", args=[id])).json() for id in ids
+        ]
+
+        # The books and the emails of their owners.
+        with self.assertNumQueries(2):
+            response = self.get_batch(ids)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"results": full_books, "missing": []})
+
+    def test_batch_reports_missing_ids(self):
+        ids = [str(self.books[1].id), self.missing_id, str(self.books[1].id)]
+
+        response = self.get_batch(ids)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [book["id"] for book in response.json()["results"]], [str(self.books[1].id)]
+        )
+        self.assertEqual(response.json()["missing"], [self.missing_id])
+
+    def test_batch_with_sparse_fields(self):
+        ids = [str(self.books[2].id), str(self.books[0].id)]
+
+        with self.assertNumQueries(1):
+            response = self.get_batch(ids, fields="title")
+
+        # I am checking that the ids are returned even when they are not requested.
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {"id": id, "title": book.title}
+                for id, book in zip(ids, self.books[::-2])
+            ],
+        )
+
+    def test_batch_with_invalid_ids(self):
+        response = self.get_batch([str(self.books[0].id), "not-an-id"])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"ids": ["Invalid ids: not-an-id."]})
+
+        response = self.client.get(self.batch_url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(), {"ids": ["This query parameter is required."]}
+        )
+
+    def test_batch_with_too_many_ids(self):
+        ids = [f"00000000-0000-4000-8000-{number:012d}" for number in range(101)]
+
+        response = self.get_batch(ids)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(), {"ids": ["At most 100 books can be requested at once."]}
+        )
+
+
+class ConditionalRequestTests(APITestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+
+        cls.token = Token.objects.create(user=cls.user)
+        cls.genre = Genre.objects.create(genre_name="Fiction")
+        cls.author = Author.objects.create(author_name="Stephen King")
+        cls.books = create_books(cls.user, 3, authors=[cls.author], genres=[cls.genre])
+
+        cls.book_list_url = reverse("books-list")
+        cls.book_detail_url = reverse("books-detail", args=[cls.books[0].id])
+
+    def test_retrieve_not_modified(self):
+        response = self.client.get(self.book_detail_url)
+        self.assertIn("Last-Modified", response)
+
+        # The book is read, but not serialized.
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.book_detail_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertIn("ETag", response)
+
+    def test_list_not_modified(self):
+        response = self.client.get(self.book_list_url, {"available": "true"})
+
+        with self.assertNumQueries(1):
+            not_modified_response = self.client.get(
+                self.book_list_url,
+                {"available": "true"},
+                HTTP_IF_NONE_MATCH=response["ETag"],
+            )
+        self.assertEqual(
+            not_modified_response.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+        # I am checking that deleting a book changes the ETag of the list.
+        self.books[2].delete()
+        modified_response = self.client.get(
+            self.book_list_url,
+            {"available": "true"},
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(modified_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(modified_response.json()), 2)
+        self.assertNotEqual(modified_response["ETag"], response["ETag"])
+
+    def test_list_has_no_last_modified(self):
+        response = self.client.get(self.book_list_url)
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+        # I am checking that a deleted book is noticed by clients which only send
+        # If-Modified-Since.
+        self.books[0].delete()
+        response = self.client.get(
+            self.book_list_url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_update_changes_etag(self):
+        etag = self.client.get(self.book_detail_url)["ETag"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        response = self.client.patch(
+            self.book_detail_url,
+            {"title": "New Title"},
+            format="json",
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(
+            self.client.get(self.book_detail_url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_200_OK,
+        )
+
+        # The client which read the book before the update has an outdated version.
+        response = self.client.patch(
+            self.book_detail_url,
+            {"title": "Other Title"},
+            format="json",
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(
+            response.json(),
+            {"detail": "The resource has been modified since it was read."},
+        )
+        self.assertEqual(Book.objects.get(id=self.books[0].id).title, "New Title")
+
+    def test_delete_with_outdated_etag(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        response = self.client.delete(self.book_detail_url, HTTP_IF_MATCH='"outdated"')
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertTrue(Book.objects.filter(id=self.books[0].id).exists())
+
+
+class OptimisticConcurrencyTests(APITestCase, UserTestsData):
+    @classmethod
+    def setUpTestData(cls):
+        UserTestsData.setUpTestData()
+
+        cls.token = Token.objects.create(user=cls.user)
+        cls.genre = Genre.objects.create(genre_name="Fiction")
+        cls.author = Author.objects.create(author_name="Stephen King")
+        cls.book = create_books(cls.user, 1, authors=[cls.author], genres=[cls.genre])[
+            0
+        ]
+
+        cls.book_detail_url = reverse("books-detail", args=[cls.book.id])
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_only_changed_fields_are_written(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                self.book_detail_url,
+                {"title": "New Title", "condition": self.book.condition},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith('UPDATE "books_book"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"title"', updates[0])
+        self.assertNotIn('"condition"', updates[0])
+        self.assertIn('WHERE ("books_book"."id"', updates[0])
+
+    def test_concurrent_update_fails(self):
+        get_object = BookViewSet.get_object
+
+        def get_object_then_update(view):
+            book = get_object(view)
+            # Another client updates the book after this request read it.
+            Book.objects.filter(id=book.id).update(
+                title="Concurrent Title", updated=timezone.now()
+            )
+            return book
+
+        with mock.patch.object(BookViewSet, "get_object", get_object_then_update):
+            response = self.client.patch(
+                self.book_detail_url, {"description": "New description"}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        book = Book.objects.get(id=self.book.id)
+        self.assertEqual(book.title, "Concurrent Title")
+        self.assertNotEqual(book.description, "New description")
+
+    def test_update_of_relations(self):
+        response = self.client.patch(
+            self.book_detail_url, {"author": ["Charles Dickens"]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        book = Book.objects.get(id=self.book.id)
+        self.assertEqual(book.author_names, ["Charles Dickens"])
+        self.assertEqual(
+            [author.author_name for author in book.author.all()], ["Charles Dickens"]
+        )
+        self.assertGreater(book.updated, self.book.updated)
+
+    def test_relations_keep_their_order(self):
+        # New authors follow the ones the book keeps, in the order of the request.
+        response = self.client.patch(
+            self.book_detail_url,
+            {"author": ["Stan Lee", "Stephen King", "Charles Dickens"]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = ["Stephen King", "Stan Lee", "Charles Dickens"]
+        self.assertEqual(response.json()["author"], expected)
+        self.assertEqual(
+            self.client.get(self.book_detail_url).json()["author"], expected
+        )
+        self.assertEqual(
+            list(
+                Book.author.through.objects.filter(book_id=self.book.id)
+                .order_by("id")
+                .values_list("author__author_name", flat=True)
+            ),
+            expected,
+        )
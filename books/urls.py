@@ -1,10 +1,55 @@
-from .views import BookViewSet, GenreListAPIView, AuthorListAPIView
+from .views import (
+    BookViewSet,
+    GenreListAPIView,
+    AuthorListAPIView,
+    BookExportAPIView,
+)
 from rest_framework.routers import SimpleRouter
-from django.urls import path
+from django.conf import settings
+from django.urls import path, re_path
 
 router = SimpleRouter()
 router.register("", BookViewSet, basename="books")
+
+if settings.ASYNC_VIEWS:
+    # The same URLs as the ones of the router, served by async views.
+    book_urls = [
+        re_path(
+            r"^$",
+            BookViewSet.as_async_view(
+                {"get": "list", "post": "create"}, basename="books", detail=False
+            ),
+            name="books-list",
+        ),
+        re_path(
+            r"^batch/$",
+            BookViewSet.as_view({"get": "batch"}, basename="books", detail=False),
+            name="books-batch",
+        ),
+        re_path(
+            r"^(?P<pk>[^/.]+)/$",
+            BookViewSet.as_async_view(
+                {
+                    "get": "retrieve",
+                    "put": "update",
+                    "patch": "partial_update",
+                    "delete": "destroy",
+                },
+                basename="books",
+                detail=True,
+            ),
+            name="books-detail",
+        ),
+    ]
+    genre_list_view = GenreListAPIView.as_async_view({"get": "list"})
+    author_list_view = AuthorListAPIView.as_async_view({"get": "list"})
+else:
+    book_urls = router.urls
+    genre_list_view = GenreListAPIView.as_view()
+    author_list_view = AuthorListAPIView.as_view()
+
 urlpatterns = [
-    path("genres/", GenreListAPIView.as_view(), name="genres-list"),
-    path("authors/", AuthorListAPIView.as_view(), name="authors-list"),
-] + router.urls
+    path("genres/", genre_list_view, name="genres-list"),
+    path("authors/", author_list_view, name="authors-list"),
+    path("export/", BookExportAPIView.as_view(), name="books-export"),
+] + book_urls
@@ -1,14 +1,35 @@
+import uuid
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.generics import ListAPIView
-from rest_framework.permissions import AllowAny
-from .serializers import BookSerializer, GenreSerializer, AuthorSerializer
+from rest_framework.generics import ListAPIView, GenericAPIView
+from rest_framework.permissions import AllowAny, SAFE_METHODS
+from .serializers import (
+    BookSerializer,
+    BookReadSerializer,
+    GenreSerializer,
+    AuthorSerializer,
+)
 from .permissions import IsOwnerOrReadOnly
-from .filters import BookFilter
+from .filters import BookFilter, BookExportFilter
+from .export import BOOK_EXPORT_FIELDS, export_book_rows
 from .models import Book, Genre, Author
 from django.db.models import Prefetch
-
-
-class BookViewSet(ModelViewSet):
+from django.conf import settings
+from django.views.static import serve
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from book_giveaway.renderers import NDJSONRenderer, CSVRenderer
+from book_giveaway.asyncviews import AsyncReadMixin
+from book_giveaway.conditional import ConditionalRequestMixin
+from book_giveaway.streaming import StreamingListMixin, is_asgi_request
+
+
+class BookViewSet(
+    ConditionalRequestMixin, StreamingListMixin, AsyncReadMixin, ModelViewSet
+):
     """
     **Book Management API Endpoint**
 
@@ -27,6 +48,7 @@ class BookViewSet(ModelViewSet):
     - `update`: Update the details of a specific book by its unique ID.
     - `partial_update`: Partially update the details of a specific book by its unique ID.
     - `destroy`: Delete a specific book by its unique ID.
+    - `batch`: Retrieve several books by their ids in one request (see the `ids` parameter for the limit).
 
     **Filtering Options:**
 
@@ -35,9 +57,34 @@ class BookViewSet(ModelViewSet):
     - `condition`: Filter books by condition (options: **'Brand New'** or **'Used'**).
     - `available`: Filter books by availability status (options: **'true'** or **'false'**).
 
+    **Streaming:**
+
+    - `stream`: Pass **'true'** to stream the list of books in chunks instead of building the whole response in memory,
+    useful for exporting big result sets. The JSON response is the same. When the server runs in ASGI mode the list
+    is not streamed.
+
+    **Batch retrieve:**
+
+    `GET /api/books/batch/?ids=<id>,<id>,...` returns `{"results": [...], "missing": [...]}`: the found books in the
+    order of the requested ids and the ids of the books that do not exist. Supports sparse fieldsets, the `id` field
+    is always returned.
+
+    **Sparse fieldsets:**
+
+    - `fields`: Comma separated list of the fields to return (for example **'id,title,book_cover,available'**),
+    only these fields are read from the database. By default all fields are returned.
+
+    **Conditional requests:**
+
+    Books have `ETag` and `Last-Modified` headers, derived from their `updated` time, lists of books only have an `ETag`.
+    Send them back in `If-None-Match` or `If-Modified-Since` to get **304 Not Modified** when nothing changed, and the
+    ETag of a book in `If-Match` when updating or deleting it to get **412 Precondition Failed** instead of overwriting
+    changes made since it was read.
+
     **Genre Field, Author Field (ManyToMany):**
 
-    The `genre` and `author` fields in the JSON response are represented as a list of genre/author names as strings.
+    The `genre` and `author` fields in the JSON response are represented as a list of genre/author names as strings,
+    in the order in which they were added to the book.
 
     **Genre and Author fields example (JSON):**
 
@@ -45,15 +92,117 @@ class BookViewSet(ModelViewSet):
     """
 
     serializer_class = BookSerializer
-    queryset = Book.objects.all().prefetch_related("genre", "author")
+    queryset = Book.objects.all().select_related("owner")
     filterset_class = BookFilter
     permission_classes = (IsOwnerOrReadOnly,)
+    batch_max_ids = 100
+
+    def get_serializer_class(self):
+        # Books are only read with safe methods, so the faster read-only serializer can be used.
+        # Schema generation still uses BookSerializer, because BookReadSerializer does not declare fields.
+        if self.request.method in SAFE_METHODS and not getattr(
+            self, "swagger_fake_view", False
+        ):
+            return BookReadSerializer
+        return super().get_serializer_class()
+
+    def get_sparse_fields(self):
+        """
+        Returns the fields requested with the `fields` query parameter by safe requests, or None.
+        """
+        value = self.request.query_params.get("fields")
+        if not value or self.request.method not in SAFE_METHODS:
+            return None
+        fields = BookReadSerializer.parse_fields(value)
+        if self.action == "batch" and "id" not in fields:
+            # Books of a batch are matched with the requested ids by their ids.
+            fields.insert(0, "id")
+        return fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = (
+            None
+            if getattr(self, "swagger_fake_view", False)
+            else self.get_sparse_fields()
+        )
+        if fields is None:
+            return queryset
+
+        # Model instances are only loaded by retrieve and by streamed lists, others read values().
+        columns = BookReadSerializer.columns_for(fields)
+        # The version of retrieved books is read for their ETag.
+        if "owner_email" in fields:
+            return queryset.only(*columns, self.version_field, "owner__email")
+        return queryset.select_related(None).only(*columns, self.version_field)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if not getattr(self, "swagger_fake_view", False):
+            context["fields"] = self.get_sparse_fields()
+        return context
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
-
-class GenreListAPIView(ListAPIView):
+    def get_batch_ids(self):
+        """
+        Returns the ids of the `ids` query parameter, without duplicates, in their order.
+        """
+        values = self.request.query_params.get("ids", "").split(",")
+        ids = []
+        invalid = []
+        for value in filter(None, (value.strip() for value in values)):
+            try:
+                ids.append(str(uuid.UUID(value)))
+            except ValueError:
+                invalid.append(value)
+
+        if invalid:
+            raise ValidationError({"ids": [f"Invalid ids: {', '.join(invalid)}."]})
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise ValidationError({"ids": ["This query parameter is required."]})
+        if len(ids) > self.batch_max_ids:
+            raise ValidationError(
+                {
+                    "ids": [
+                        f"At most {self.batch_max_ids} books can be requested at once."
+                    ]
+                }
+            )
+        return ids
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "ids",
+                str,
+                required=True,
+                description=f"Comma separated ids of the books, at most {batch_max_ids}.",
+            )
+        ],
+    )
+    @action(detail=False, methods=["get"], filter_backends=[])
+    def batch(self, request, *args, **kwargs):
+        ids = self.get_batch_ids()
+        queryset = self.get_queryset().filter(id__in=ids)
+        books = {
+            book["id"]: book for book in self.get_serializer(queryset, many=True).data
+        }
+
+        return Response(
+            {
+                "results": [books[id] for id in ids if id in books],
+                "missing": [id for id in ids if id not in books],
+            }
+        )
+
+    async def aserialize_list(self, queryset):
+        return await self.get_serializer().aqueryset_to_representation(queryset)
+
+
+class GenreListAPIView(AsyncReadMixin, ListAPIView):
     """
     **Genre List API Endpoint**
 
@@ -81,7 +230,7 @@ class GenreListAPIView(ListAPIView):
     permission_classes = [AllowAny]
 
 
-class AuthorListAPIView(ListAPIView):
+class AuthorListAPIView(StreamingListMixin, AsyncReadMixin, ListAPIView):
     """
     **Author List API Endpoint**
 
@@ -95,6 +244,10 @@ class AuthorListAPIView(ListAPIView):
 
     - `list`: Gets a list of all available authors.
 
+    **Streaming:**
+
+    - `stream`: Pass **'true'** to stream the list of authors in chunks instead of building the whole response in memory.
+
     **Author Field (JSON Response):**
 
     The authors are represented as a list of dictionaries, each containing the `id` and `author_name` fields.
@@ -107,3 +260,70 @@ class AuthorListAPIView(ListAPIView):
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
     permission_classes = [AllowAny]
+
+
+class BookExportAPIView(GenericAPIView):
+    """
+    **Book Catalogue Export API Endpoint**
+
+    This view exports the whole book catalogue (or only the books updated after a given moment) for
+    analytics jobs. Books are streamed to the client as they are read from the database, so exports of
+    any size can be downloaded. When the server runs in ASGI mode the whole export is read before it is sent.
+
+    **Authentication:**
+    - Authentication is required to access this view.
+
+    **Formats:**
+
+    - `format=ndjson` (default): Newline delimited JSON, one book per line.
+    - `format=csv`: CSV with a header line, authors and genres are separated with `;`.
+
+    The format can also be selected with the `Accept` header (`application/x-ndjson` or `text/csv`).
+
+    **Filtering Options:**
+
+    - `updated__gt`: Export only books updated after the given date and time (ISO 8601), for incremental exports.
+    Books are ordered by the `updated` field, so the last exported value can be used for the next export.
+
+    **Exported fields:**
+
+    `id`, `title`, `ISBN`, `author`, `genre`, `owner`, `owner_email`, `description`, `condition`, `book_cover`,
+    `available`, `retrieval_location`, `created`, `updated`
+    """
+
+    queryset = Book.objects.all()
+    filterset_class = BookExportFilter
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    @extend_schema(
+        responses={
+            (200, NDJSONRenderer.media_type): OpenApiTypes.STR,
+            (200, CSVRenderer.media_type): OpenApiTypes.STR,
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by("updated", "id")
+        chunks = export_book_rows(queryset, settings.STREAMING_CHUNK_SIZE, request)
+        renderer = request.accepted_renderer
+        content = renderer.render_chunks(chunks, fieldnames=BOOK_EXPORT_FIELDS)
+        if is_asgi_request(request):
+            # The export is read from the database here, in the thread of the view, because the
+            # ASGI handler would iterate it in the event loop.
+            content = list(content)
+
+        return StreamingHttpResponse(content, content_type=renderer.media_type)
+
+
+def serve_book_cover(request, path):
+    """
+    Serves content-addressed book covers stored by `BookCoverStorage` in development (it is only
+    routed with `DEBUG`). In production the web server or CDN serves `MEDIA_URL` from `MEDIA_ROOT`
+    and should send the same Cache-Control header for the covers under
+    `BookCoverStorage.digest_directory`.
+
+    Content behind these file names never changes (new content means new name), so the
+    responses are marked as immutable and can be cached by browsers and CDNs for a year.
+    """
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response